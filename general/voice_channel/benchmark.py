@@ -0,0 +1,508 @@
+"""
+Benchmark of the voice channel hot path (voice state updates, joins, leaves, locking and group expansion).
+
+The cog is driven with fake discord objects, fakeredis and a temporary SQLite database, so no discord connection is
+required. Every REST request a fake object would send is counted instead. Requires fakeredis and aiosqlite.
+
+Usage (from the directory containing the cog package):
+    python -m <package>.general.voice_channel.benchmark [-n ITERATIONS] [SCENARIO ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from itertools import count
+from pathlib import Path
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from discord import CategoryChannel, Guild, Member, PermissionOverwrite, Permissions, Role, VoiceChannel
+from discord.abc import GuildChannel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from PyDrocsid import redis_client
+from PyDrocsid.database import Base, db, db_context
+
+from . import cog as voice_channel_cog
+from .cog import Overwrites, VoiceChannelCog
+from .name_index import NameIndex
+from .scheduler import VoiceEventScheduler
+
+
+snowflakes = count(1 << 60, 1 << 22)
+
+
+class Metrics:
+    def __init__(self):
+        self.queries = 0
+        self.requests: Counter[str] = Counter()
+
+    def reset(self):
+        self.queries = 0
+        self.requests.clear()
+
+    def request(self, route: str):
+        self.requests[route] += 1
+
+
+metrics = Metrics()
+
+
+class FakeVoiceState:
+    def __init__(self, channel: FakeVoiceChannel | None):
+        self.channel: FakeVoiceChannel | None = channel
+        self.suppress = False
+
+
+class FakeMessage:
+    def __init__(self, channel: FakeVoiceChannel, message_id: int | None = None):
+        self.channel: FakeVoiceChannel = channel
+        self.guild: FakeGuild = channel.guild
+        self.id: int = message_id or next(snowflakes)
+        self.jump_url = f"https://discord.com/channels/{self.guild.id}/{channel.id}/{self.id}"
+
+    async def edit(self, **_):
+        metrics.request("edit_message")
+
+
+class FakeRole(Role):
+    def __init__(self, guild: FakeGuild, role_id: int, position: int):
+        self.guild = guild
+        self.id = role_id
+        self.name = f"role-{position}"
+        self.position = position
+        self._permissions = Permissions.general().value
+
+    @property
+    def members(self) -> list[FakeMember]:
+        return [member for member in self.guild.members if self in member.roles]
+
+
+class FakeMember(Member):
+    def __init__(self, guild: FakeGuild, member_id: int, bot: bool):
+        self.guild = guild
+        self.member_id: int = member_id
+        self.is_bot: bool = bot
+        self.role_set: set[FakeRole] = set()
+        self.voice_state: FakeVoiceState | None = None
+
+    def __str__(self):
+        return f"member-{self.member_id}"
+
+    def __repr__(self):
+        return f"<FakeMember id={self.member_id}>"
+
+    def __hash__(self):
+        return hash(self.member_id)
+
+    @property
+    def id(self) -> int:
+        return self.member_id
+
+    @property
+    def bot(self) -> bool:
+        return self.is_bot
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.member_id}>"
+
+    @property
+    def roles(self) -> list[FakeRole]:
+        return [self.guild.default_role, *sorted(self.role_set)]
+
+    @property
+    def voice(self) -> FakeVoiceState | None:
+        return self.voice_state
+
+    async def edit(self, *, roles: list[FakeRole] | None = None, **_):
+        metrics.request("edit_member")
+        if roles is not None:
+            self.role_set = set(roles)
+
+    async def move_to(self, channel: FakeVoiceChannel | None, **_):
+        metrics.request("edit_member")
+        self.voice_state = FakeVoiceState(channel) if channel else None
+
+
+class FakeVoiceChannel(VoiceChannel):
+    def __init__(self, guild: FakeGuild, channel_id: int, name: str, category: FakeCategory, overwrites: Overwrites):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category_id = category.id
+        self.channel_overwrites: Overwrites = dict(overwrites)
+
+    @property
+    def overwrites(self) -> Overwrites:
+        return dict(self.channel_overwrites)
+
+    def overwrites_for(self, obj: Member | Role) -> PermissionOverwrite:
+        return self.channel_overwrites.get(obj, PermissionOverwrite())
+
+    @property
+    def members(self) -> list[FakeMember]:
+        return [member for member in self.guild.members if member.voice and member.voice.channel == self]
+
+    async def edit(self, *, name: str | None = None, overwrites: Overwrites | None = None, **_):
+        metrics.request("edit_channel")
+        if name is not None:
+            self.name = name
+        if overwrites is not None:
+            self.channel_overwrites = dict(overwrites)
+
+    async def set_permissions(self, target: Member | Role, **permissions):
+        metrics.request("edit_channel_permissions")
+        self.channel_overwrites[target] = PermissionOverwrite(**permissions)
+
+    async def delete(self, **_):
+        metrics.request("delete_channel")
+        self.guild.guild_channels.pop(self.id, None)
+
+    async def send(self, *_, **__) -> FakeMessage:
+        metrics.request("send_message")
+        return FakeMessage(self)
+
+    async def fetch_message(self, message_id: int | str) -> FakeMessage:
+        metrics.request("fetch_message")
+        return FakeMessage(self, int(message_id))
+
+
+class FakeCategory(CategoryChannel):
+    def __init__(self, guild: FakeGuild, channel_id: int, name: str):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.category_id = None
+
+    @property
+    def channels(self) -> list[GuildChannel]:
+        return [channel for channel in self.guild.channels if channel.category_id == self.id]
+
+    async def create_voice_channel(self, name: str, *, overwrites: Overwrites | None = None, **_) -> FakeVoiceChannel:
+        metrics.request("create_channel")
+        return self.guild.add_voice_channel(name, self, overwrites or {})
+
+
+class FakeGuild(Guild):
+    def __init__(self):
+        self.id = next(snowflakes)
+        self.name = "benchmark"
+        self.guild_channels: dict[int, GuildChannel] = {}
+        self.guild_members: dict[int, FakeMember] = {}
+        self.guild_roles: dict[int, FakeRole] = {}
+
+        self.guild_roles[self.id] = FakeRole(self, self.id, 0)
+        self.bot_member = self.add_member(bot=True)
+
+    @property
+    def channels(self) -> list[GuildChannel]:
+        return [*self.guild_channels.values()]
+
+    @property
+    def voice_channels(self) -> list[FakeVoiceChannel]:
+        return [channel for channel in self.guild_channels.values() if isinstance(channel, VoiceChannel)]
+
+    @property
+    def members(self) -> list[FakeMember]:
+        return [*self.guild_members.values()]
+
+    @property
+    def roles(self) -> list[FakeRole]:
+        return sorted(self.guild_roles.values())
+
+    @property
+    def default_role(self) -> FakeRole:
+        return self.guild_roles[self.id]
+
+    @property
+    def me(self) -> FakeMember:
+        return self.bot_member
+
+    def get_channel(self, channel_id: int | None) -> GuildChannel | None:
+        return self.guild_channels.get(channel_id)
+
+    def get_member(self, member_id: int | None) -> FakeMember | None:
+        return self.guild_members.get(member_id)
+
+    def get_role(self, role_id: int | None) -> FakeRole | None:
+        return self.guild_roles.get(role_id)
+
+    def add_role(self) -> FakeRole:
+        role = FakeRole(self, next(snowflakes), len(self.guild_roles))
+        self.guild_roles[role.id] = role
+        return role
+
+    def add_member(self, *, bot: bool = False) -> FakeMember:
+        member = FakeMember(self, next(snowflakes), bot)
+        self.guild_members[member.id] = member
+        return member
+
+    def add_category(self, name: str) -> FakeCategory:
+        category = FakeCategory(self, next(snowflakes), name)
+        self.guild_channels[category.id] = category
+        return category
+
+    def add_voice_channel(self, name: str, category: FakeCategory, overwrites: Overwrites) -> FakeVoiceChannel:
+        channel = FakeVoiceChannel(self, next(snowflakes), name, category, overwrites)
+        self.guild_channels[channel.id] = channel
+        return channel
+
+
+class FakeBot:
+    def __init__(self, guild: FakeGuild):
+        self.guilds: list[FakeGuild] = [guild]
+
+    def get_channel(self, channel_id: int | None) -> GuildChannel | None:
+        return self.guilds[0].get_channel(channel_id)
+
+
+class DeferredScheduler(VoiceEventScheduler):
+    """Holds back all voice events until they are released instead of waiting for their delays."""
+
+    def __init__(self, process):
+        super().__init__(process)
+        self._held: list[tuple[FakeMember, FakeVoiceChannel, bool]] = []
+
+    def push(self, member: Member, channel: VoiceChannel, join: bool, delay: float) -> None:
+        self._held.append((member, channel, join))
+
+    def release(self) -> None:
+        for member, channel, join in self._held:
+            super().push(member, channel, join, 0)
+        self._held.clear()
+
+
+async def send_editable_log(channel: FakeVoiceChannel, *_, **__) -> FakeMessage:
+    """Stand-in for PyDrocsid's send_editable_log, which needs the message history of the channel."""
+
+    return await channel.send()
+
+
+class World:
+    """A guild with one dynamic voice channel group and a fresh cog, database and redis."""
+
+    def __init__(self, cog: VoiceChannelCog, guild: FakeGuild, voice_channels: list[FakeVoiceChannel]):
+        self.cog = cog
+        self.guild = guild
+        self.voice_channels = voice_channels
+        self._background: set[asyncio.Task] = set()
+
+    @classmethod
+    async def create(cls, name_index: NameIndex, layout: list[int]) -> World:
+        """Create a dynamic voice channel group with one channel per layout entry containing that many members."""
+
+        background = asyncio.all_tasks()
+
+        async with db.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        await redis_client.redis.flushall()
+
+        guild = FakeGuild()
+        category = guild.add_category("voice")
+        user_role = guild.add_role()
+        link_role = guild.add_role()
+
+        cog = VoiceChannelCog(team_roles=[])
+        cog.bot = FakeBot(guild)
+        cog.name_index = name_index
+        cog.voice_events = DeferredScheduler(cog.process_voice_events)
+        cog.log_writer.delay = 0
+
+        world = cls(cog, guild, [])
+        async with db_context():
+            await cog.dyn_cache.load()
+            await cog.role_links.load()
+            await cog.voice_logs.load()
+
+            for i, occupants in enumerate(layout):
+                voice_channel = guild.add_voice_channel(
+                    f"voice-{i}",
+                    category,
+                    {
+                        user_role: PermissionOverwrite(view_channel=True, connect=True),
+                        guild.me: PermissionOverwrite(view_channel=True, connect=True, manage_channels=True),
+                    },
+                )
+                world.voice_channels.append(voice_channel)
+                if not i:
+                    group = await cog.dyn_cache.create_group(voice_channel.id, user_role.id, False)
+                    await cog.role_links.add(link_role.id, group.id)
+                    dyn_channel = cog.dyn_cache.get(voice_channel.id)
+                else:
+                    dyn_channel = await cog.dyn_cache.create_channel(voice_channel.id, group)
+
+                for j in range(occupants):
+                    member = guild.add_member()
+                    member.voice_state = FakeVoiceState(voice_channel)
+                    member.role_set.add(link_role)
+                    voice_channel.channel_overwrites[member] = PermissionOverwrite(
+                        send_messages=True, add_reactions=True
+                    )
+                    channel_member = await cog.dyn_cache.add_member(dyn_channel, member.id)
+                    if not j:
+                        await cog.dyn_cache.update_channel(dyn_channel, owner_id=channel_member.id)
+                        await cog.owners.set(voice_channel.id, member.id)
+
+                cog.sync_occupancy(dyn_channel)
+
+        world._background = asyncio.all_tasks() - background
+        return world
+
+    async def move(self, member: FakeMember, channel: FakeVoiceChannel | None):
+        before = member.voice or FakeVoiceState(None)
+        member.voice_state = FakeVoiceState(channel) if channel else None
+        async with db_context():
+            await self.cog.on_voice_state_update(member, before, member.voice or FakeVoiceState(None))
+
+    async def settle(self):
+        """Process all held back voice events and wait until all background work has finished."""
+
+        self.cog.voice_events.release()
+        while tasks := asyncio.all_tasks() - self._background - {asyncio.current_task()}:
+            await asyncio.gather(*tasks)
+
+    async def close(self):
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+
+class Scenario:
+    def __init__(self, name: str, layout: list[int], run: Callable[[World], Awaitable[None]]):
+        self.name = name
+        self.layout = layout
+        self.run = run
+
+
+async def single_join(world: World):
+    await world.move(world.guild.add_member(), world.voice_channels[0])
+
+
+async def mass_move(world: World):
+    source, target = world.voice_channels[:2]
+    for member in source.members:
+        await world.move(member, target)
+
+
+async def lock(world: World):
+    voice_channel = world.voice_channels[0]
+    async with db_context():
+        dyn_channel = world.cog.dyn_cache.get(voice_channel.id)
+        owner = await world.cog.get_owner_from_cache(dyn_channel)
+        await world.cog.lock_channel(owner, dyn_channel, voice_channel, hide=False)
+
+
+async def group_expansion(world: World):
+    await world.move(world.guild.add_member(), world.voice_channels[-1])
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("single_join", [3, 0], single_join),
+        Scenario("mass_move_50", [50, 0, 0], mass_move),
+        Scenario("lock_25", [25, 0], lock),
+        Scenario("group_expansion", [2, 0], group_expansion),
+    ]
+}
+
+
+class Result:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.queries = 0
+        self.requests: Counter[str] = Counter()
+
+    def percentile(self, p: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0
+        return quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+
+async def run_scenario(scenario: Scenario, name_index: NameIndex, iterations: int) -> Result:
+    result = Result(scenario.name)
+    for _ in range(iterations):
+        world = await World.create(name_index, scenario.layout)
+        try:
+            metrics.reset()
+            start = perf_counter()
+            await scenario.run(world)
+            await world.settle()
+            result.latencies.append(perf_counter() - start)
+            result.queries += metrics.queries
+            result.requests.update(metrics.requests)
+        finally:
+            await world.close()
+
+    return result
+
+
+def patch_redis(fake) -> None:
+    original = redis_client.redis
+    for module in [*sys.modules.values()]:
+        if getattr(module, "redis", None) is original:
+            module.redis = fake
+
+
+def count_query(*_):
+    metrics.queries += 1
+
+
+async def run(scenarios: list[Scenario], iterations: int):
+    name_index = NameIndex.load(Path(__file__).parent.joinpath("names"))
+    voice_channel_cog.send_editable_log = send_editable_log
+    voice_channel_cog.role_updates.delay = 0
+
+    with TemporaryDirectory() as directory:
+        db.engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/benchmark.db")
+        event.listen(db.engine.sync_engine, "before_cursor_execute", count_query)
+
+        # warm up caches and lazy imports
+        await run_scenario(scenarios[0], name_index, 1)
+
+        print(f"{'scenario':<20}{'p50':>10}{'p99':>10}{'queries':>10}{'requests':>10}")
+        for scenario in scenarios:
+            result = await run_scenario(scenario, name_index, iterations)
+            print(
+                f"{result.name:<20}"
+                f"{result.percentile(50) * 1000:>8.2f}ms"
+                f"{result.percentile(99) * 1000:>8.2f}ms"
+                f"{result.queries / iterations:>10.1f}"
+                f"{sum(result.requests.values()) / iterations:>10.1f}"
+            )
+            for route, cnt in sorted(result.requests.items()):
+                print(f"    {route:<28}{cnt / iterations:>8.1f}")
+
+        await db.engine.dispose()
+
+
+def main():
+    try:
+        import aiosqlite  # noqa: F401
+        from fakeredis.aioredis import FakeRedis
+    except ImportError:
+        raise SystemExit("the voice channel benchmark requires fakeredis and aiosqlite")
+
+    parser = argparse.ArgumentParser(description="Benchmark the voice channel hot path.")
+    parser.add_argument("-n", "--iterations", type=int, default=50, help="iterations per scenario")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help=f"one of {', '.join(SCENARIOS)}")
+    args = parser.parse_args()
+
+    if unknown := [name for name in args.scenarios if name not in SCENARIOS]:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    patch_redis(FakeRedis(decode_responses=True))
+    asyncio.run(run([SCENARIOS[name] for name in args.scenarios or SCENARIOS], args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+
+from discord.abc import GuildChannel
+from sqlalchemy import and_, or_, update
+
+from PyDrocsid.database import db, delete, select
+from PyDrocsid.redis_client import redis
+
+from .models import DynChannel, DynChannelMember, DynGroup, DynGroupSparePool, RoleVoiceLink, VoiceChannelLog
+from ...invalidation import InvalidationSignal
+
+
+# Increment the version of the owner of a channel and store the owner together with the new version in one step.
+# KEYS: owner hash, version hash
+# ARGV: channel id, member id
+# Returns the new version.
+SET_OWNER_SCRIPT = """
+local version = redis.call("HINCRBY", KEYS[2], ARGV[1], 1)
+redis.call("HSET", KEYS[1], ARGV[1], version .. ":" .. ARGV[2])
+return version
+"""
+
+set_owner = redis.register_script(SET_OWNER_SCRIPT)
+
+
+class CachedGroup:
+    def __init__(self, group_id: str, user_role: int, text_channel_by_default: bool, spare_channels: int = 0):
+        self.id: str = group_id
+        self.user_role: int = user_role
+        self.text_channel_by_default: bool = text_channel_by_default
+        self.spare_channels: int = spare_channels
+        self.channels: list[CachedChannel] = []
+
+        # live occupancy of the voice channels of this group
+        self.occupied_channels: int = 0
+        self.populated_channels: int = 0
+        self.connected_humans: int = 0
+        self.connected_bots: int = 0
+
+    @property
+    def empty_channels(self) -> int:
+        """The number of channels without human members."""
+
+        return len(self.channels) - self.populated_channels
+
+
+class CachedChannel:
+    def __init__(
+        self,
+        channel_id: int,
+        text_id: int | None,
+        locked: bool,
+        no_ping: bool,
+        group: CachedGroup,
+        owner_id: str | None,
+        owner_override: int | None,
+    ):
+        self.channel_id: int = channel_id
+        self.text_id: int | None = text_id
+        self.locked: bool = bool(locked)
+        self.no_ping: bool = bool(no_ping)
+        self.group: CachedGroup = group
+        self.owner_id: str | None = owner_id
+        self.owner_override: int | None = owner_override
+        self.members: list[CachedMember] = []
+        self.connected_humans: set[int] = set()
+        self.connected_bots: set[int] = set()
+
+    @property
+    def occupied(self) -> bool:
+        return bool(self.connected_humans or self.connected_bots)
+
+    @property
+    def group_id(self) -> str:
+        return self.group.id
+
+    def get_member(self, *, member_id: int | None = None, row_id: str | None = None) -> CachedMember | None:
+        """Find a channel member either by its discord id or by the id of its database row."""
+
+        for member in self.members:
+            if member.member_id == member_id or member.id == row_id:
+                return member
+
+        return None
+
+
+class CachedMember:
+    def __init__(self, row_id: str, member_id: int, channel_id: int, timestamp: datetime):
+        self.id: str = row_id
+        self.member_id: int = member_id
+        self.channel_id: int = channel_id
+        self.timestamp: datetime = timestamp
+
+
+class DynVoiceCache:
+    """
+    In-process copy of all dynamic voice channel groups, channels and members.
+
+    The cache is loaded once and is authoritative afterwards, i.e. every mutation must go through the methods of this
+    class, which update the cached objects and write the changes through to the database. Once the surrounding
+    transaction has been committed, the changes are announced to the other nodes using an invalidation signal. If it is
+    rolled back instead, the cache is reloaded from the database on the next refresh.
+
+    Additionally, the cache keeps track of the members currently connected to each channel and maintains per group
+    occupancy counters from the voice state changes, so no channel has to be scanned to decide whether a group has to
+    grow or shrink. Updates are idempotent, so a channel can be resynchronised with discord at any time.
+    """
+
+    def __init__(self):
+        self.groups: dict[str, CachedGroup] = {}
+        self.channels: dict[int, CachedChannel] = {}
+        self.text_channels: dict[int, CachedChannel] = {}
+        self.signal = InvalidationSignal("voice_channel:dyn")
+
+    def get(self, channel_id: int) -> CachedChannel | None:
+        return self.channels.get(channel_id)
+
+    def get_by_text(self, text_id: int) -> CachedChannel | None:
+        return self.text_channels.get(text_id)
+
+    async def load(self) -> None:
+        await self.signal.sync()
+
+        groups: dict[str, CachedGroup] = {}
+        channels: dict[int, CachedChannel] = {}
+
+        group: DynGroup
+        async for group in await db.stream(select(DynGroup, [DynGroup.channels, DynChannel.members])):
+            cached_group = groups[group.id] = CachedGroup(group.id, group.user_role, group.text_channel_by_default)
+            for channel in group.channels:
+                cached_channel = CachedChannel(
+                    channel.channel_id,
+                    channel.text_id,
+                    channel.locked,
+                    channel.no_ping,
+                    cached_group,
+                    channel.owner_id,
+                    channel.owner_override,
+                )
+                cached_channel.members = [
+                    CachedMember(member.id, member.member_id, member.channel_id, member.timestamp)
+                    for member in channel.members
+                ]
+                cached_group.channels.append(cached_channel)
+                channels[channel.channel_id] = cached_channel
+
+        pool: DynGroupSparePool
+        async for pool in await db.stream(select(DynGroupSparePool)):
+            if group := groups.get(pool.group_id):
+                group.spare_channels = pool.size
+
+        self.groups = groups
+        self.channels = channels
+        self.text_channels = {channel.text_id: channel for channel in channels.values() if channel.text_id}
+
+    def _add_channel(self, group: CachedGroup, channel_id: int) -> CachedChannel:
+        channel = CachedChannel(channel_id, None, False, False, group, None, None)
+        group.channels.append(channel)
+        self.channels[channel_id] = channel
+        return channel
+
+    def _drop_channel(self, channel: CachedChannel) -> None:
+        self.set_occupancy(channel, set(), set())
+        self.channels.pop(channel.channel_id, None)
+        if channel.text_id:
+            self.text_channels.pop(channel.text_id, None)
+        if channel in channel.group.channels:
+            channel.group.channels.remove(channel)
+
+    def set_occupancy(self, channel: CachedChannel, humans: set[int], bots: set[int]) -> None:
+        """Replace the connected members of a channel, e.g. with the members discord reports for it."""
+
+        group = channel.group
+        group.occupied_channels += bool(humans or bots) - channel.occupied
+        group.populated_channels += bool(humans) - bool(channel.connected_humans)
+        group.connected_humans += len(humans) - len(channel.connected_humans)
+        group.connected_bots += len(bots) - len(channel.connected_bots)
+        channel.connected_humans = humans
+        channel.connected_bots = bots
+
+    def voice_join(self, channel_id: int, member_id: int, bot: bool) -> None:
+        """Count a member who has connected to a voice channel."""
+
+        if not (channel := self.channels.get(channel_id)):
+            return
+
+        members = channel.connected_bots if bot else channel.connected_humans
+        if member_id in members:
+            return
+
+        group = channel.group
+        group.occupied_channels += not channel.occupied
+        if bot:
+            group.connected_bots += 1
+        else:
+            group.populated_channels += not channel.connected_humans
+            group.connected_humans += 1
+        members.add(member_id)
+
+    def voice_leave(self, channel_id: int, member_id: int, bot: bool) -> None:
+        """Count a member who has disconnected from a voice channel."""
+
+        if not (channel := self.channels.get(channel_id)):
+            return
+
+        members = channel.connected_bots if bot else channel.connected_humans
+        if member_id not in members:
+            return
+
+        members.remove(member_id)
+        group = channel.group
+        group.occupied_channels -= not channel.occupied
+        if bot:
+            group.connected_bots -= 1
+        else:
+            group.populated_channels -= not channel.connected_humans
+            group.connected_humans -= 1
+
+    async def create_group(self, channel_id: int, user_role: int, text_channel_by_default: bool) -> CachedGroup:
+        row = await DynGroup.create(channel_id, user_role, text_channel_by_default)
+        group = self.groups[row.id] = CachedGroup(row.id, user_role, text_channel_by_default)
+        self._add_channel(group, channel_id)
+        self.signal.bump_after_commit()
+        return group
+
+    async def create_channel(self, channel_id: int, group: CachedGroup) -> CachedChannel:
+        await DynChannel.create(channel_id, group.id)
+        channel = self._add_channel(group, channel_id)
+        self.signal.bump_after_commit()
+        return channel
+
+    async def update_group(self, group: CachedGroup, **values) -> None:
+        for key, value in values.items():
+            setattr(group, key, value)
+
+        await db.exec(update(DynGroup).where(DynGroup.id == group.id).values(**values))
+        self.signal.bump_after_commit()
+
+    async def set_spare_channels(self, group: CachedGroup, size: int) -> None:
+        group.spare_channels = size
+        await DynGroupSparePool.set(group.id, size)
+        self.signal.bump_after_commit()
+
+    async def update_channel(self, channel: CachedChannel, **values) -> None:
+        if "text_id" in values:
+            self.text_channels.pop(channel.text_id, None)
+            if values["text_id"]:
+                self.text_channels[values["text_id"]] = channel
+
+        for key, value in values.items():
+            setattr(channel, key, value)
+
+        await db.exec(update(DynChannel).where(DynChannel.channel_id == channel.channel_id).values(**values))
+        self.signal.bump_after_commit()
+
+    async def add_member(self, channel: CachedChannel, member_id: int) -> CachedMember:
+        row = await DynChannelMember.create(member_id, channel.channel_id)
+        member = CachedMember(row.id, member_id, channel.channel_id, row.timestamp)
+        channel.members.append(member)
+        self.signal.bump_after_commit()
+        return member
+
+    async def remove_members(self, channel: CachedChannel, member_ids: set[int] | None = None) -> None:
+        """Remove the given members (or all members if member_ids is None) from a channel."""
+
+        statement = delete(DynChannelMember).filter_by(channel_id=channel.channel_id)
+        if member_ids is None:
+            channel.members = []
+        else:
+            statement = statement.where(DynChannelMember.member_id.in_(member_ids))
+            channel.members = [member for member in channel.members if member.member_id not in member_ids]
+
+        await db.exec(statement)
+        self.signal.bump_after_commit()
+
+    async def delete_channel(self, channel: CachedChannel) -> None:
+        await db.exec(delete(DynChannelMember).filter_by(channel_id=channel.channel_id))
+        await db.exec(delete(DynChannel).filter_by(channel_id=channel.channel_id))
+        self._drop_channel(channel)
+        self.signal.bump_after_commit()
+
+    async def delete_group(self, group: CachedGroup) -> None:
+        if channel_ids := [channel.channel_id for channel in group.channels]:
+            await db.exec(delete(DynChannelMember).where(DynChannelMember.channel_id.in_(channel_ids)))
+        await db.exec(delete(DynChannel).filter_by(group_id=group.id))
+        await db.exec(delete(DynGroup).filter_by(id=group.id))
+        await db.exec(delete(DynGroupSparePool).filter_by(group_id=group.id))
+
+        for channel in [*group.channels]:
+            self._drop_channel(channel)
+        self.groups.pop(group.id, None)
+        self.signal.bump_after_commit()
+
+
+class RoleLinkCache:
+    """
+    In-process index of all role voice links, mapping voice channel ids (or dynamic group ids) to role ids.
+
+    Changes are announced to all other nodes using an invalidation signal, which makes them reload their index before
+    the next lookup.
+    """
+
+    def __init__(self):
+        self.links: dict[str, set[int]] = {}
+        self.signal = InvalidationSignal("voice_channel:role_links")
+
+    def get(self, voice_channel: str) -> set[int]:
+        return self.links.get(voice_channel, set())
+
+    def exists(self, role: int, voice_channel: str) -> bool:
+        return role in self.links.get(voice_channel, ())
+
+    async def load(self) -> None:
+        await self.signal.sync()
+
+        links: dict[str, set[int]] = {}
+        link: RoleVoiceLink
+        async for link in await db.stream(select(RoleVoiceLink)):
+            links.setdefault(link.voice_channel, set()).add(link.role)
+
+        self.links = links
+
+    async def refresh(self) -> None:
+        """Reload the index if it has been changed by another node."""
+
+        if await self.signal.is_stale():
+            await self.load()
+
+    async def add(self, role: int, voice_channel: str) -> None:
+        await RoleVoiceLink.create(role, voice_channel)
+        self.links.setdefault(voice_channel, set()).add(role)
+        self.signal.bump_after_commit()
+
+    async def remove(self, links: Iterable[tuple[int, str]]) -> None:
+        """Remove the given (role, voice_channel) links."""
+
+        if not (links := [*links]):
+            return
+
+        await db.exec(
+            delete(RoleVoiceLink).where(
+                or_(*[and_(RoleVoiceLink.role == role, RoleVoiceLink.voice_channel == vc) for role, vc in links])
+            )
+        )
+        for role, voice_channel in links:
+            if (roles := self.links.get(voice_channel)) is not None:
+                roles.discard(role)
+                if not roles:
+                    self.links.pop(voice_channel)
+
+        self.signal.bump_after_commit()
+
+
+class VoiceLogCache:
+    """
+    In-process copy of the log modes of non-dynamic voice channels and categories.
+
+    The effective mode of a channel is resolved from its own entry or, if there is none, from the entry of the
+    category it currently belongs to. As the category is taken from the discord channel, moving a channel to another
+    category does not require any invalidation.
+    """
+
+    def __init__(self):
+        self.modes: dict[int, int] = {}
+        self.signal = InvalidationSignal("voice_channel:log")
+
+    async def load(self) -> None:
+        await self.signal.sync()
+        self.modes = {int(row.channel_id): row.mode async for row in await db.stream(select(VoiceChannelLog))}
+
+    async def refresh(self) -> None:
+        """Reload the log modes if they have been changed by another node."""
+
+        if await self.signal.is_stale():
+            await self.load()
+
+    async def get_mode(self, channel: GuildChannel) -> int:
+        """Return the effective log mode of a channel."""
+
+        await self.refresh()
+        if (mode := self.modes.get(channel.id)) is None:
+            mode = self.modes.get(channel.category_id, 0)
+        return mode
+
+    async def set(self, channel_id: int, mode: int) -> None:
+        await VoiceChannelLog.create(str(channel_id), mode)
+        self.modes[channel_id] = mode
+        self.signal.bump_after_commit()
+
+    async def remove(self, channel_ids: Iterable[int]) -> None:
+        if not (channel_ids := [*channel_ids]):
+            return
+
+        await db.exec(delete(VoiceChannelLog).where(VoiceChannelLog.channel_id.in_(map(str, channel_ids))))
+        for channel_id in channel_ids:
+            self.modes.pop(channel_id, None)
+        self.signal.bump_after_commit()
+
+
+class OwnerCache:
+    """
+    Owners of dynamic voice channels.
+
+    Every change is mirrored to a redis hash together with a version number per channel, so that a node which takes
+    over can load all owners at once instead of recomputing them.
+    """
+
+    KEY = "dynvc_owners"
+
+    def __init__(self):
+        self._owners: dict[int, tuple[int, int]] = {}
+
+    def get(self, channel_id: int) -> int | None:
+        """Return the id of the cached owner of a channel."""
+
+        return entry[0] if (entry := self._owners.get(channel_id)) else None
+
+    async def set(self, channel_id: int, member_id: int | None) -> None:
+        if member_id is None:
+            self._owners.pop(channel_id, None)
+            await redis.hdel(self.KEY, channel_id)
+            return
+
+        # concurrent setters on different nodes must not be able to store an older version after a newer one
+        version = await set_owner(keys=[self.KEY, f"{self.KEY}:version"], args=[channel_id, member_id])
+        self._owners[channel_id] = member_id, int(version)
+
+    async def load(self, channel_ids: Iterable[int]) -> None:
+        """Load the owners of the given channels from redis and remove the entries of all other channels."""
+
+        channel_ids = set(channel_ids)
+        stale: list[str] = []
+        for field, value in (await redis.hgetall(self.KEY)).items():
+            if int(field) not in channel_ids:
+                stale.append(field)
+                continue
+
+            version, member_id = map(int, value.split(":"))
+            if (entry := self._owners.get(int(field))) and entry[1] >= version:
+                continue
+            self._owners[int(field)] = member_id, version
+
+        if stale:
+            await redis.hdel(self.KEY, *stale)
+            await redis.hdel(f"{self.KEY}:version", *stale)
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import random
-from datetime import timedelta
+from datetime import date, timedelta
+from functools import cached_property
 from itertools import count
 from os import getenv
 from pathlib import Path
@@ -28,16 +29,16 @@ from discord import (
     RawAuditLogEntryEvent,
     AuditLogAction, StageChannel,
 )
-from discord.abc import Messageable
+from discord.abc import GuildChannel, Messageable
 from discord.ext import commands, tasks
 from discord.ext.commands import CommandError, Context, Greedy, UserInputError, guild_only, max_concurrency
 from discord.ui import Button
 from discord.utils import format_dt, utcnow
 
-from PyDrocsid.async_thread import GatherAnyError, gather_any, run_as_task
+from PyDrocsid.async_thread import GatherAnyError, gather_any, run_as_task, semaphore_gather
 from PyDrocsid.cog import Cog
 from PyDrocsid.command import Confirmation, MaintenanceAwareView, docs, optional_permissions, reply
-from PyDrocsid.database import db, db_context, db_wrapper, delete, filter_by, select
+from PyDrocsid.database import db, db_context, db_wrapper, filter_by, select
 from PyDrocsid.embeds import send_long_embed
 from PyDrocsid.emojis import name_to_emoji
 from PyDrocsid.logger import get_logger
@@ -49,9 +50,15 @@ from PyDrocsid.translations import t
 from PyDrocsid.types import GuildMessageable
 from PyDrocsid.util import DynamicVoiceConverter, check_role_assignable, escape_codeblock, send_editable_log
 
+from .cache import CachedChannel, CachedGroup, CachedMember, DynVoiceCache, OwnerCache, RoleLinkCache, VoiceLogCache
 from .colors import Colors
-from .models import AllowedChannelName, DynChannel, DynChannelMember, DynGroup, RoleVoiceLink, VoiceChannelLog
+from .log_writer import LogBatch, VoiceLogWriter
+from .models import AllowedChannelName
+from .name_allocator import NameAllocator
+from .name_index import NameIndex
+from .name_matcher import NameMatcher, Segmentation
 from .permissions import VoiceChannelPermission
+from .scheduler import ChannelBatcher, RoleSyncProgress, VoiceEvent, VoiceEventScheduler
 from .settings import DynamicVoiceSettings, VoiceChannelSettings
 from ...contributor import Contributor
 from ...pubsub import send_alert, send_to_changelog
@@ -62,8 +69,19 @@ t = t.voice_channel
 
 Overwrites = dict[Member | Role, PermissionOverwrite]
 
+MAX_NAME_COMBINATIONS = 50
+ROLE_UPDATE_DELAY = 1
+ROLE_SYNC_CONCURRENCY = 5
+MAX_SPARE_CHANNELS = 10
+VOICE_LOG_DELAY = 2
+VOICE_LOG_MAX_LINES = 20
+STATUS_LOG_DELAY = 1
+
+STATUS_ACTIONS = {AuditLogAction.voice_channel_status_update, AuditLogAction.voice_channel_status_delete}
+
 join_requests = MultiLock[int]()
 channel_locks = ReentrantMultiLock[int]()
+spare_locks = MultiLock[str]()
 
 logger = get_logger(__name__)
 
@@ -75,6 +93,59 @@ def merge_permission_overwrites(overwrites: Overwrites, *args: tuple[Member | Ro
     return out
 
 
+class OverwriteTransaction:
+    """
+    Accumulates permission overwrite changes for a voice channel and its text channel and applies them with at most
+    one edit per channel.
+    """
+
+    def __init__(self, voice_channel: VoiceChannel, text_channel: TextChannel | None):
+        self.voice_channel = voice_channel
+        self.text_channel = text_channel
+        self._voice: Overwrites | None = None
+        self._text: Overwrites | None = None
+
+    @property
+    def voice_overwrites(self) -> Overwrites:
+        return self.voice_channel.overwrites if self._voice is None else self._voice
+
+    @property
+    def text_overwrites(self) -> Overwrites:
+        return self.text_channel.overwrites if self._text is None else self._text
+
+    def set_voice(self, overwrites: Overwrites):
+        self._voice = overwrites
+
+    def set_text(self, overwrites: Overwrites):
+        if self.text_channel:
+            self._text = overwrites
+
+    def update_voice(self, *args: tuple[Member | Role, PermissionOverwrite]):
+        self._voice = merge_permission_overwrites(self.voice_overwrites, *args)
+
+    def update_text(self, *args: tuple[Member | Role, PermissionOverwrite]):
+        if self.text_channel:
+            self._text = merge_permission_overwrites(self.text_overwrites, *args)
+
+    async def commit(self):
+        """Apply all changes. Raises a CommandError if any channel could not be edited."""
+
+        error: CommandError | None = None
+        for channel, overwrites in [(self.voice_channel, self._voice), (self.text_channel, self._text)]:
+            if overwrites is None or overwrites == channel.overwrites:
+                continue
+
+            try:
+                await channel.edit(overwrites=overwrites)
+            except HTTPException:
+                # e.g. missing permissions, rate limits or a channel which has been deleted in the meantime
+                error = error or CommandError(t.could_not_overwrite_permissions(channel.mention))
+
+        self._voice = self._text = None
+        if error:
+            raise error
+
+
 def check_voice_permissions(voice_channel: VoiceChannel, role: Role) -> bool:
     view_channel = voice_channel.overwrites_for(role).view_channel
     connect = voice_channel.overwrites_for(role).connect
@@ -85,29 +156,96 @@ def check_voice_permissions(voice_channel: VoiceChannel, role: Role) -> bool:
     return view_channel and connect
 
 
-async def collect_links(guild: Guild, link_set, channel_id):
-    link: RoleVoiceLink
-    async for link in await db.stream(filter_by(RoleVoiceLink, voice_channel=channel_id)):
-        if role := guild.get_role(link.role):
+def collect_links(guild: Guild, link_set: set[Role], role_ids: set[int]):
+    for role_id in role_ids:
+        if role := guild.get_role(role_id):
             link_set.add(role)
 
 
-async def update_roles(member: Member, *, add: set[Role] = None, remove: set[Role] = None):
-    add = add or set()
-    remove = remove or set()
-    add, remove = add - remove, remove - add
+async def edit_roles(member: Member, add: set[Role], remove: set[Role]) -> bool:
+    """Apply role changes to a member with a single request. Returns False if the member could not be edited."""
 
-    for role in remove:
-        try:
-            await member.remove_roles(role)
-        except Forbidden:
-            await send_alert(member.guild, t.could_not_remove_roles(role.mention, member.mention))
+    current = {role for role in member.roles if not role.is_default()}
+    roles = (current - remove) | add
+    if roles == current:
+        return True
 
-    for role in add:
-        try:
-            await member.add_roles(role)
-        except Forbidden:
-            await send_alert(member.guild, t.could_not_add_roles(role.mention, member.mention))
+    try:
+        await member.edit(roles=sorted(roles))
+    except Forbidden:
+        if removed := current - roles:
+            mentions = ", ".join(role.mention for role in removed)
+            await send_alert(member.guild, t.could_not_remove_roles(mentions, member.mention))
+        if added := roles - current:
+            mentions = ", ".join(role.mention for role in added)
+            await send_alert(member.guild, t.could_not_add_roles(mentions, member.mention))
+        return False
+    except HTTPException as e:
+        logger.warning("could not update roles of %s: %s", member, e)
+        return False
+
+    return True
+
+
+def diff_role_links(role_voice_links: dict[Role, list[VoiceChannel]]) -> dict[Member, tuple[set[Role], set[Role]]]:
+    """Compute the roles which have to be added to and removed from members according to the role voice links."""
+
+    role_changes: dict[Member, tuple[set[Role], set[Role]]] = {}
+    for role, channels in role_voice_links.items():
+        members = set()
+        for channel in channels:
+            members.update(channel.members)
+        for member in members:
+            if role not in member.roles:
+                role_changes.setdefault(member, (set(), set()))[0].add(role)
+        for member in role.members:
+            if member not in members:
+                role_changes.setdefault(member, (set(), set()))[1].add(role)
+
+    return role_changes
+
+
+class RoleUpdateQueue:
+    """
+    Coalesces the role changes of members within a short time window and applies them with a single request.
+
+    Later changes override earlier ones, so e.g. hopping back and forth between two linked channels results in at most
+    one request per member.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: dict[int, tuple[Member, set[Role], set[Role]]] = {}
+        self._locks = MultiLock[int]()
+
+    def push(self, member: Member, add: set[Role], remove: set[Role]) -> None:
+        add, remove = add - remove, remove - add
+        if not add and not remove:
+            return
+
+        if member.id not in self._pending:
+            self._pending[member.id] = member, set(), set()
+            asyncio.create_task(self._apply(member.id))
+
+        _, pending_add, pending_remove = self._pending[member.id]
+        pending_add.difference_update(remove)
+        pending_remove.difference_update(add)
+        pending_add.update(add)
+        pending_remove.update(remove)
+
+    async def _apply(self, member_id: int) -> None:
+        await asyncio.sleep(self.delay)
+
+        async with self._locks[member_id]:
+            member, add, remove = self._pending.pop(member_id)
+            await edit_roles(member.guild.get_member(member_id) or member, add, remove)
+
+
+role_updates = RoleUpdateQueue(ROLE_UPDATE_DELAY)
+
+
+def update_roles(member: Member, *, add: set[Role] = None, remove: set[Role] = None):
+    role_updates.push(member, add or set(), remove or set())
 
 
 async def get_commands_embed() -> Embed:
@@ -132,12 +270,12 @@ async def rename_channel(channel: TextChannel | VoiceChannel, name: str):
         raise CommandError(t.rename_rate_limit)
 
 
-def get_user_role(guild: Guild, channel: DynChannel) -> Role | None:
+def get_user_role(guild: Guild, channel: CachedChannel) -> Role | None:
     return guild.get_role(channel.group.user_role)
 
 
 def remove_lock_overrides(
-    channel: DynChannel,
+    channel: CachedChannel,
     voice_channel: VoiceChannel,
     overwrites: Overwrites,
     *,
@@ -162,7 +300,7 @@ def remove_lock_overrides(
 
 
 async def safe_create_voice_channel(
-    category: CategoryChannel | Guild, channel: DynChannel, name: str, overwrites: Overwrites
+    category: CategoryChannel | Guild, channel: CachedChannel, name: str, overwrites: Overwrites
 ) -> VoiceChannel:
     guild: Guild = category.guild if isinstance(category, CategoryChannel) else category
     user_role: Role = get_user_role(guild, channel)
@@ -188,7 +326,7 @@ async def safe_create_voice_channel(
 
 
 class ControlMessage(MaintenanceAwareView):
-    def __init__(self, cog: VoiceChannelCog, channel: DynChannel, message: Message):
+    def __init__(self, cog: VoiceChannelCog, channel: CachedChannel, message: Message):
         super().__init__(timeout=None)
         self.cog = cog
         self.channel = channel
@@ -204,8 +342,8 @@ class ControlMessage(MaintenanceAwareView):
         self.children[4].label = t.buttons["ping" if no_ping else "no_ping"]
         self.children[4].emoji = name_to_emoji["bell" if no_ping else "no_bell"]
 
-    async def update(self):
-        self.channel = await DynChannel.get(channel_id=self.channel.channel_id)
+    def update(self):
+        self.channel = self.cog.dyn_cache.get(self.channel.channel_id)
 
     def get_status(self):
         voice_channel: VoiceChannel = self.cog.bot.get_channel(self.channel.channel_id)
@@ -228,7 +366,7 @@ class ControlMessage(MaintenanceAwareView):
     @ui.button()
     @db_wrapper
     async def lock(self, _, interaction: Interaction):
-        await self.update()
+        self.update()
         try:
             await self.cog.check_authorization(self.channel, interaction.user)
         except CommandError:
@@ -246,7 +384,7 @@ class ControlMessage(MaintenanceAwareView):
     @ui.button()
     @db_wrapper
     async def hide(self, _, interaction: Interaction):
-        await self.update()
+        self.update()
         try:
             await self.cog.check_authorization(self.channel, interaction.user)
         except CommandError:
@@ -264,7 +402,7 @@ class ControlMessage(MaintenanceAwareView):
     @ui.button()
     @db_wrapper
     async def ping(self, _, interaction: Interaction):
-        await self.update()
+        self.update()
         try:
             await self.cog.check_authorization(self.channel, interaction.user)
         except CommandError:
@@ -277,40 +415,6 @@ class ControlMessage(MaintenanceAwareView):
             await interaction.response.defer()
 
 
-def _recurse_name_check(
-    s: str,
-    allowed: dict[str, set[str]],
-    dp: list[bool],
-    name_parts: list[tuple[str, str]],
-    result: list[list[tuple[str, str]]],
-    require_whitespaces: bool = True,
-):
-    for i in reversed(range(len(s))):
-        if s[i] == " " and (i + 1 >= len(s) or dp[i + 1]):
-            dp[i] = True
-            continue
-        if dp[i]:
-            continue
-        for filename, names in allowed.items():
-            for w in names:
-                # wenn etwas passt
-                if (
-                    s[i : i + len(w)] == w
-                    and (i + len(w) >= len(s) or dp[i + len(w)] and (not require_whitespaces or s[i + len(w)] == " "))
-                    and not any(dp[i : i + len(w)])
-                ):
-                    dp_copy = dp.copy()
-                    dp_copy[i : i + len(w)] = [True] * len(w)
-                    name_parts_copy = name_parts.copy()
-                    name_parts_copy.append((filename, w))
-                    # wenn das wort vollständig ist -> keine weitere recursion, ergebnis speichern
-                    if dp_copy[0]:
-                        result.append(list(reversed(name_parts_copy)))
-                    else:
-                        # wenn das wort unvollständig ist -> recursion mit dem gefundenen ende
-                        _recurse_name_check(s, allowed, dp_copy, name_parts_copy, result, require_whitespaces)
-
-
 class VoiceChannelCog(Cog, name="Voice Channels"):
     CONTRIBUTORS = [
         Contributor.Defelo,
@@ -326,77 +430,103 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
     def __init__(self, team_roles: list[str]):
         self.team_roles: list[str] = team_roles
-        self._owners: dict[int, Member] = {}
-
-        self._join_tasks: dict[tuple[Member, VoiceChannel], asyncio.Task] = {}
-        self._leave_tasks: dict[tuple[Member, VoiceChannel], asyncio.Task] = {}
-        self._recent_kicks: set[tuple[Member, VoiceChannel]] = set()
+        self.owners = OwnerCache()
+
+        self.voice_events = VoiceEventScheduler(self.process_voice_events)
+        self.status_changes = ChannelBatcher(self.process_status_changes, STATUS_LOG_DELAY)
+        self.role_sync = RoleSyncProgress()
+        self.dyn_cache = DynVoiceCache()
+        self.role_links = RoleLinkCache()
+        self.voice_logs = VoiceLogCache()
+        self.log_writer = VoiceLogWriter(self.write_voice_log, VOICE_LOG_DELAY, VOICE_LOG_MAX_LINES)
         self.custom_names = set()
 
+        self._name_allocators: dict[int, tuple[date, NameAllocator]] = {}
+
+    @cached_property
+    def name_index(self) -> NameIndex:
+        return NameIndex.load(Path(__file__).parent.joinpath("names"))
+
+    @cached_property
+    def names(self) -> dict[str, tuple[str, ...]]:
+        """The name lists used to generate channel names."""
+
         names = getenv("VOICE_CHANNEL_NAMES", "*")
         if names == "*":
-            name_lists = [file.name.removesuffix(".txt") for file in Path(__file__).parent.joinpath("names").iterdir()]
-        else:
-            name_lists = names.split(",")
-
-        self.names: dict[str, set[str]] = {}
-        for name_list in name_lists:
-            self.names[name_list] = set()
-            with Path(__file__).parent.joinpath(f"names/{name_list}.txt").open() as file:
-                for name in file.readlines():
-                    if name := name.strip():
-                        self.names[name_list].add(name)
-
-        self.allowed_names: dict[str, set[str]] = {}
-        for path in Path(__file__).parent.joinpath("names").iterdir():
-            if not path.name.endswith(".txt"):
-                continue
+            return self.name_index.names
+
+        return {name_list: self.name_index.names[name_list] for name_list in names.split(",")}
 
-            with path.open() as file:
-                self.allowed_names.update({path.stem: set(map(lambda x: x.strip().lower(), file.readlines()))})
+    @cached_property
+    def name_matcher(self) -> NameMatcher:
+        """Matcher of the shared name index extended by the custom names of this cog."""
+
+        return self.name_index.matcher.copy()
 
     def prepare(self) -> bool:
         return bool(self.names)
 
-    def check_name(self, name, find_all, require_whitespaces) -> tuple[bool, list[list[tuple[str, str]]]]:
-        s = name.lower()
-        allowed = self.allowed_names.copy()
-        allowed.update({"custom_database_names": self.custom_names})
-        dp = [False for _ in s]
-        if not find_all:
-            for i in reversed(range(len(s))):
-                if s[i] == " " and (i + 1 >= len(s) or dp[i + 1]):
-                    dp[i] = True
-                    continue
-                for _, names in allowed.items():
-                    for w in names:
-                        if s[i : i + len(w)] == w and (
-                            i + len(w) >= len(s) or dp[i + len(w)] and (not require_whitespaces or s[i + len(w)] == " ")
-                        ):
-                            dp[i] = True
-                            break
-            return dp[0], []
-        all_name_fragments: list[list[tuple[str, str]]] = []
-        _recurse_name_check(s.lower(), allowed, dp, [], all_name_fragments, require_whitespaces)
-        return bool(all_name_fragments), all_name_fragments
+    def check_name(self, name: str, require_whitespaces: bool) -> bool:
+        return self.name_matcher.matches(name.lower(), require_whitespaces)
+
+    def split_name(self, name: str, require_whitespaces: bool) -> Segmentation:
+        return self.name_matcher.segment(name.lower(), require_whitespaces)
 
     def _get_name_list(self, guild_id: int) -> str:
         r = random.Random(f"{guild_id}{utcnow().date().isoformat()}")
         return r.choice(sorted(self.names))
 
-    def _random_channel_name(self, guild_id: int, avoid: set[str]) -> str | None:
-        names = self.names[self._get_name_list(guild_id)]
-        allowed = list({*names} - avoid)
-        if allowed and random.randrange(100):
-            return random.choice(allowed)
+    def get_name_allocator(self, guild: Guild) -> NameAllocator:
+        """Return the name allocator for today's name list of a guild."""
+
+        today = utcnow().date()
+        if (entry := self._name_allocators.get(guild.id)) and entry[0] == today:
+            return entry[1]
+
+        allocator = NameAllocator(
+            self.names[self._get_name_list(guild.id)], [channel.name for channel in guild.voice_channels]
+        )
+        self._name_allocators[guild.id] = today, allocator
+        return allocator
+
+    def get_cached_name_allocator(self, guild: Guild) -> NameAllocator | None:
+        """Return the name allocator of a guild without creating it."""
+
+        return entry[1] if (entry := self._name_allocators.get(guild.id)) else None
+
+    async def on_guild_channel_create(self, channel: GuildChannel):
+        if not isinstance(channel, VoiceChannel):
+            return
+        if (allocator := self.get_cached_name_allocator(channel.guild)) is not None:
+            allocator.use(channel.name)
+
+    async def on_guild_channel_delete(self, channel: GuildChannel):
+        if not isinstance(channel, VoiceChannel):
+            return
+        if (allocator := self.get_cached_name_allocator(channel.guild)) is not None:
+            allocator.release(channel.name)
+
+    async def on_guild_channel_update(self, before: GuildChannel, after: GuildChannel):
+        if not isinstance(after, VoiceChannel) or before.name == after.name:
+            return
+
+        if (allocator := self.get_cached_name_allocator(after.guild)) is not None:
+            allocator.release(before.name)
+            allocator.use(after.name)
 
+    def _random_channel_name(self, guild: Guild) -> str | None:
+        name = self.get_name_allocator(guild).pick()
+        if name and random.randrange(100):
+            return name
+
+        avoid = {channel.name for channel in guild.voice_channels}
         a = "acddfilmmrtneeelnoioanopflofckrztrhetri  pu2aolain  hpkkxo "
         a += "ai  ea     nt  ul      y  st          u          f          f           "
         c = len(b := [*range(13 - 37 + 42 + ((4 > 2) << 4 - 2) >> (1 & 3 & 3 & 7 & ~42))])
         return random.shuffle(b) or next((e for d in b if (e := a[d::c].strip()) not in avoid), None)
 
     async def get_channel_name(self, guild: Guild) -> str:
-        return self._random_channel_name(guild.id, {channel.name for channel in guild.voice_channels})
+        return self._random_channel_name(guild)
 
     async def is_teamler(self, member: Member) -> bool:
         return any(
@@ -405,32 +535,33 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             if (team_role := member.guild.get_role(await RoleSettings.get(role_name))) is not None
         )
 
-    def get_text_channel(self, channel: DynChannel) -> TextChannel | None:
+    def get_text_channel(self, channel: CachedChannel) -> TextChannel | None:
         return self.bot.get_channel(channel.text_id)
 
-    def get_voice_channel(self, channel: DynChannel) -> VoiceChannel:
+    def get_voice_channel(self, channel: CachedChannel) -> VoiceChannel:
         return self.bot.get_channel(channel.channel_id)
 
-    async def get_owner_from_cache(self, channel: DynChannel) -> Member | None:
-        if out := self._owners.get(channel.channel_id):
+    async def get_owner_from_cache(self, channel: CachedChannel) -> Member | None:
+        if (member_id := self.owners.get(channel.channel_id)) and (out := self.bot.guilds[0].get_member(member_id)):
             return out
 
-        self._owners[channel.channel_id] = await self.fetch_owner_from_db(channel)
-        return self._owners[channel.channel_id]
+        owner = await self.fetch_owner_from_db(channel)
+        await self.owners.set(channel.channel_id, owner and owner.id)
+        return owner
 
-    async def fetch_owner_from_db(self, channel: DynChannel) -> Member | None:
+    async def fetch_owner_from_db(self, channel: CachedChannel) -> Member | None:
         voice_channel: VoiceChannel = self.bot.get_channel(channel.channel_id)
 
         if channel.owner_override and any(channel.owner_override == member.id for member in voice_channel.members):
             return voice_channel.guild.get_member(channel.owner_override)
 
-        owner: DynChannelMember | None = await db.get(DynChannelMember, id=channel.owner_id)
+        owner: CachedMember | None = channel.get_member(row_id=channel.owner_id)
         if owner and any(owner.member_id == member.id for member in voice_channel.members):
             return voice_channel.guild.get_member(owner.member_id)
 
         return await self.fix_owner(channel)
 
-    async def fix_owner(self, dyn_channel: DynChannel) -> Member | None:
+    async def fix_owner(self, dyn_channel: CachedChannel) -> Member | None:
         voice_channel: VoiceChannel = self.bot.get_channel(dyn_channel.channel_id)
 
         in_voice = {m.id for m in voice_channel.members}
@@ -440,24 +571,31 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                 if member.bot:
                     continue
 
-                dyn_channel.owner_id = m.id
+                await self.dyn_cache.update_channel(dyn_channel, owner_id=m.id)
                 return await self.cache_owner(dyn_channel, member)
 
-        dyn_channel.owner_id = None
+        await self.dyn_cache.update_channel(dyn_channel, owner_id=None)
         return await self.cache_owner(dyn_channel, None)
 
-    async def cache_owner(self, channel: DynChannel, new_owner: Member | None) -> Member | None:
-        old_owner: Member | None = self._owners.get(channel.channel_id)
+    async def cache_owner(self, channel: CachedChannel, new_owner: Member | None) -> Member | None:
+        old_owner: int | None = self.owners.get(channel.channel_id)
 
         if not new_owner:
-            self._owners.pop(channel.channel_id, None)
-        elif old_owner != new_owner:
-            self._owners[channel.channel_id] = new_owner
+            await self.owners.set(channel.channel_id, None)
+        elif old_owner != new_owner.id:
+            await self.owners.set(channel.channel_id, new_owner.id)
             await self.send_voice_msg(channel, t.voice_channel, [t.voice_owner_changed(new_owner.mention)])
 
         return new_owner
 
-    async def send_voice_msg(self, channel: DynChannel | VoiceChannel | StageChannel, title: str, msgs: list[str], force_new_embed: bool = False, add_controls: bool = True):
+    async def send_voice_msg(
+        self,
+        channel: CachedChannel | VoiceChannel | StageChannel,
+        title: str,
+        msgs: list[str],
+        force_new_embed: bool = False,
+        add_controls: bool = True,
+    ):
         if not isinstance(channel, VoiceChannel) and not isinstance(channel, StageChannel):
             try:
                 voice_channel: VoiceChannel = self.get_voice_channel(channel)
@@ -470,24 +608,37 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             color = int(Colors.unlocked)
 
         now = format_dt(now := utcnow(), style="D") + " " + format_dt(now, style="T")
+        await self.log_writer.write(
+            voice_channel,
+            title,
+            color,
+            [(now, line) for line in msgs],
+            force_new_embed=force_new_embed,
+            controls=channel if add_controls and isinstance(channel, CachedChannel) else None,
+        )
+
+    async def write_voice_log(self, batch: LogBatch):
         try:
             message: Message = await send_editable_log(
-                voice_channel,
-                title,
+                batch.channel,
+                batch.title,
                 "",
-                [(now, line) for line in msgs],
-                colour=color,
-                force_new_embed=force_new_embed,
+                batch.lines,
+                colour=batch.colour,
+                force_new_embed=batch.force_new_embed,
                 force_new_field=True,
             )
         except Forbidden:
-            await send_alert(voice_channel.guild, t.could_not_send_voice_msg(voice_channel.mention))
+            await send_alert(batch.channel.guild, t.could_not_send_voice_msg(batch.channel.mention))
+            return
+        except NotFound:
+            # the channel has been deleted in the meantime
             return
 
-        if add_controls and isinstance(channel, DynChannel):
-            await self.update_control_message(channel, message)
+        if batch.controls and self.dyn_cache.get(batch.controls.channel_id) is batch.controls:
+            await self.update_control_message(batch.controls, message)
 
-    async def update_control_message(self, channel: DynChannel, message: Message):
+    async def update_control_message(self, channel: CachedChannel, message: Message):
         async def clear_view(msg_id):
             try:
                 await (await message.channel.fetch_message(msg_id)).edit(view=None)
@@ -503,7 +654,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         await message.edit(view=ControlMessage(self, channel, message))
 
-    async def check_authorization(self, channel: DynChannel, member: Member):
+    async def check_authorization(self, channel: CachedChannel, member: Member):
         if await VoiceChannelPermission.override_owner.check_permissions(member):
             return
 
@@ -519,20 +670,16 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         check_owner: bool,
         check_locked: bool = False,
         channel: VoiceChannel | TextChannel | None = None,
-    ) -> tuple[DynChannel, VoiceChannel, TextChannel | None]:
+    ) -> tuple[CachedChannel, VoiceChannel, TextChannel | None]:
         if not channel and member.voice is not None and member.voice.channel is not None:
             channel = member.voice.channel
         if not channel:
             raise CommandError(t.not_in_voice)
 
         if isinstance(channel, TextChannel):
-            db_channel: DynChannel | None = await db.get(
-                DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, text_id=channel.id
-            )
+            db_channel: CachedChannel | None = self.dyn_cache.get_by_text(channel.id)
         else:
-            db_channel: DynChannel | None = await db.get(
-                DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=channel.id
-            )
+            db_channel: CachedChannel | None = self.dyn_cache.get(channel.id)
 
         if not db_channel:
             raise CommandError(t.not_a_dynamic_channel)
@@ -548,51 +695,90 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         return db_channel, voice_channel, text_channel
 
-    async def on_ready(self):
-        guild: Guild = self.bot.guilds[0]
+    async def resolve_role_links(self, guild: Guild) -> dict[Role, list[VoiceChannel]]:
+        """Resolve the role voice links to roles and voice channels and delete stale links in one go."""
 
         role_voice_links: dict[Role, list[VoiceChannel]] = {}
+        stale_links: list[tuple[int, str]] = []
 
-        link: RoleVoiceLink
-        async for link in await db.stream(select(RoleVoiceLink)):
-            role: Role | None = guild.get_role(link.role)
-            if role is None:
-                await db.delete(link)
-                continue
-
-            if link.voice_channel.isnumeric():
-                voice: VoiceChannel | None = guild.get_channel(int(link.voice_channel))
-                if not voice:
-                    await db.delete(link)
-                else:
-                    role_voice_links.setdefault(role, []).append(voice)
-            else:
-                group: DynGroup | None = await db.get(DynGroup, DynGroup.channels, id=link.voice_channel)
-                if not group:
-                    await db.delete(link)
+        for voice_channel, role_ids in self.role_links.links.items():
+            for role_id in role_ids:
+                role: Role | None = guild.get_role(role_id)
+                if role is None:
+                    stale_links.append((role_id, voice_channel))
                     continue
 
-                for channel in group.channels:
-                    if voice := guild.get_channel(channel.channel_id):
+                if voice_channel.isnumeric():
+                    voice: VoiceChannel | None = guild.get_channel(int(voice_channel))
+                    if not voice:
+                        stale_links.append((role_id, voice_channel))
+                    else:
                         role_voice_links.setdefault(role, []).append(voice)
+                else:
+                    group: CachedGroup | None = self.dyn_cache.groups.get(voice_channel)
+                    if not group:
+                        stale_links.append((role_id, voice_channel))
+                        continue
 
-        role_changes: dict[Member, tuple[set[Role], set[Role]]] = {}
-        for role, channels in role_voice_links.items():
-            members = set()
-            for channel in channels:
-                members.update(channel.members)
-            for member in members:
-                if role not in member.roles:
-                    role_changes.setdefault(member, (set(), set()))[0].add(role)
-            for member in role.members:
-                if member not in members:
-                    role_changes.setdefault(member, (set(), set()))[1].add(role)
+                    for channel in group.channels:
+                        if voice := guild.get_channel(channel.channel_id):
+                            role_voice_links.setdefault(role, []).append(voice)
+
+        await self.role_links.remove(stale_links)
+        self.role_sync.stale_links += len(stale_links)
+        return role_voice_links
+
+    @run_as_task
+    async def sync_link_roles(self, role_changes: dict[Member, tuple[set[Role], set[Role]]]):
+        """Apply the role changes computed on startup with a bounded number of concurrent requests."""
 
-        for member, (add, remove) in role_changes.items():
-            asyncio.create_task(update_roles(member, add=add, remove=remove))
+        progress = self.role_sync
+        progress.start(len(role_changes))
+
+        async def apply(member: Member, add: set[Role], remove: set[Role]):
+            if not await edit_roles(member, add, remove):
+                progress.failed += 1
+            progress.done += 1
+            if progress.done % 100 == 0:
+                logger.info("updated roles of %s/%s members", progress.done, progress.total)
+
+        await semaphore_gather(ROLE_SYNC_CONCURRENCY, *[apply(m, *changes) for m, changes in role_changes.items()])
+        progress.finish()
+        logger.info("updated roles of %s members in %.1fs", progress.total, progress.duration)
+
+    async def load_dyn_cache(self):
+        await self.dyn_cache.load()
+        for channel in self.dyn_cache.channels.values():
+            self.sync_occupancy(channel)
+        await self.owners.load(self.dyn_cache.channels)
+
+    async def refresh_dyn_cache(self):
+        """Reload the dynamic voice channels if they have been changed by another node or a rollback."""
+
+        if await self.dyn_cache.signal.is_stale():
+            await self.load_dyn_cache()
+
+    async def cog_before_invoke(self, ctx: Context):
+        await self.refresh_dyn_cache()
+
+    async def on_ready(self):
+        guild: Guild = self.bot.guilds[0]
+
+        await self.load_dyn_cache()
+
+        await self.role_links.load()
+        await self.voice_logs.load()
+
+        role_voice_links = await self.resolve_role_links(guild)
+        await self.sync_link_roles(diff_role_links(role_voice_links))
+
+        for group in self.dyn_cache.groups.values():
+            if group.spare_channels:
+                await self.refill_spare_channels(group)
 
         async for item in await db.stream(select(AllowedChannelName)):
             self.custom_names.add(item.name)
+            self.name_matcher.add(item.name, "custom_database_names")
 
         try:
             self.vc_loop.start()
@@ -601,70 +787,37 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             self.vc_loop.restart()
 
     async def on_raw_audit_log_entry(self, entry: RawAuditLogEntryEvent):
-        if entry.action_type == AuditLogAction.voice_channel_status_delete:
-            channel_id = int(entry.extra['channel_id'])
-            if db_channel := await db.get(DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=channel_id):
-                async with channel_locks[channel_id]:
-                    await self.send_voice_msg(
-                        db_channel, t.voice_channel, [t.channel_status_deleted(f"<@{entry.user_id}>")]
-                    )
+        if entry.action_type not in STATUS_ACTIONS:
+            return
+
+        self.status_changes.push(int(entry.extra["channel_id"]), entry)
+
+    async def process_status_changes(self, channel_id: int, entries: list[RawAuditLogEntryEvent]):
+        """Log a burst of voice channel status changes with one message per log channel."""
+
+        lines = []
+        log_lines = []
+        for entry in entries:
+            user = f"<@{entry.user_id}>"
+            if entry.action_type == AuditLogAction.voice_channel_status_delete:
+                lines.append(t.channel_status_deleted(user))
+                log_lines.append(t.log_channel_status_deleted(user, f"<#{channel_id}>", channel_id))
             else:
-                if channel := self.bot.get_channel(channel_id):
-                    if settings := (await VoiceChannelLog.get(channel_id=str(channel.id)) or await VoiceChannelLog.get(channel_id=str(channel.category.id))):
-                        if settings.mode & 8:
-                            await self.send_voice_msg(channel, t.voice_channel, [t.channel_status_deleted(f"<@{entry.user_id}>")], add_controls=False)
-            if channel := await VoiceChannelSettings.vc_status_logchannel.get():
-                try:
-                    await self.bot.get_channel(channel).send(
-                        embed=Embed(
-                            colour=Colors.Voice,
-                            title=t.voice_channel,
-                            description=t.log_channel_status_deleted(
-                                f"<@{entry.user_id}>",
-                                f"<#{entry.extra['channel_id']}>",
-                                channel_id
-                            )
-                        ))
-                except Forbidden:
-                    logger.warning(f"Could not sent vc status update in {channel_id}")
-        if entry.action_type == AuditLogAction.voice_channel_status_update:
-            channel_id = int(entry.extra['channel_id'])
-            if db_channel := await db.get(DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=channel_id):
+                lines.append(t.channel_status_set(user, entry.extra["status"]))
+                log_lines.append(t.log_channel_status_set(user, f"<#{channel_id}>", channel_id, entry.extra["status"]))
+
+        async with db_context():
+            if db_channel := self.dyn_cache.get(channel_id):
                 async with channel_locks[channel_id]:
-                    await self.send_voice_msg(
-                        db_channel, t.voice_channel, [t.channel_status_set(
-                            f"<@{entry.user_id}>",
-                            entry.extra["status"]
-                        )]
-                    )
-            else:
-                if channel := self.bot.get_channel(channel_id):
-                    if settings := (await VoiceChannelLog.get(channel_id=str(channel.id)) or await VoiceChannelLog.get(channel_id=str(channel.category.id))):
-                        if settings.mode & 8:
-                            await self.send_voice_msg(
-                                channel,
-                                t.voice_channel,
-                                [
-                                    t.channel_status_set(
-                                        f"<@{entry.user_id}>",
-                                        entry.extra["status"]
-                                    )
-                                ],
-                                add_controls=False
-                            )
-            if channel := await VoiceChannelSettings.vc_status_logchannel.get():
+                    await self.send_voice_msg(db_channel, t.voice_channel, lines)
+            elif (channel := self.bot.get_channel(channel_id)) and await self.voice_logs.get_mode(channel) & 8:
+                await self.send_voice_msg(channel, t.voice_channel, lines, add_controls=False)
+
+            if log_channel := self.bot.get_channel(await VoiceChannelSettings.vc_status_logchannel.get()):
                 try:
-                    await self.bot.get_channel(channel).send(
-                        embed=Embed(
-                            colour=Colors.Voice,
-                            title=t.voice_channel,
-                            description=t.log_channel_status_set(
-                                f"<@{entry.user_id}>",
-                                f"<#{entry.extra['channel_id']}>",
-                                channel_id,
-                                entry.extra["status"]
-                            )
-                        ))
+                    await send_long_embed(
+                        log_channel, Embed(colour=Colors.Voice, title=t.voice_channel, description="\n".join(log_lines))
+                    )
                 except Forbidden:
                     logger.warning(f"Could not sent vc status update in {channel_id}")
 
@@ -673,43 +826,31 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     async def vc_loop(self):
         guild: Guild = self.bot.guilds[0]
 
-        channel: DynChannel
-        async for channel in await db.stream(select(DynChannel)):
+        for channel in [*self.dyn_cache.channels.values()]:
             voice_channel: VoiceChannel | None = guild.get_channel(channel.channel_id)
             if not voice_channel:
-                await db.delete(channel)
+                await self.dyn_cache.delete_channel(channel)
                 continue
 
             # if not voice_channel.members:
             #     asyncio.create_task(voice_channel.edit(name=await self.get_channel_name(guild)))
 
-    async def lock_channel(self, member: Member, channel: DynChannel, voice_channel: VoiceChannel, *, hide: bool):
+    async def lock_channel(self, member: Member, channel: CachedChannel, voice_channel: VoiceChannel, *, hide: bool):
         locked = channel.locked
-        channel.locked = True
+        await self.dyn_cache.update_channel(channel, locked=True)
         member_overwrites = [
             (member, PermissionOverwrite(view_channel=True, connect=True)) for member in voice_channel.members
         ]
-        overwrites = merge_permission_overwrites(
-            voice_channel.overwrites,
+        transaction = OverwriteTransaction(voice_channel, self.get_text_channel(channel))
+        transaction.update_voice(
             (
                 voice_channel.guild.get_role(channel.group.user_role),
                 PermissionOverwrite(view_channel=not hide, connect=False),
             ),
             *member_overwrites,
         )
-
-        try:
-            await voice_channel.edit(overwrites=overwrites)
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(voice_channel.mention))
-
-        try:
-            if text_channel := self.get_text_channel(channel):
-                await text_channel.edit(
-                    overwrites=merge_permission_overwrites(text_channel.overwrites, *member_overwrites)
-                )
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(text_channel.mention))
+        transaction.update_text(*member_overwrites)
+        await transaction.commit()
 
         if hide:
             await self.send_voice_msg(channel, t.voice_channel, [t.hidden(member.mention)], force_new_embed=not locked)
@@ -717,53 +858,49 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             await self.send_voice_msg(channel, t.voice_channel, [t.locked(member.mention)], force_new_embed=True)
 
     async def unlock_channel(
-        self, member: Member | None, channel: DynChannel, voice_channel: VoiceChannel, *, skip_text: bool = False
+        self, member: Member | None, channel: CachedChannel, voice_channel: VoiceChannel, *, skip_text: bool = False
     ):
-        channel.locked = False
-        overwrites = remove_lock_overrides(
-            channel, voice_channel, voice_channel.overwrites, keep_members=False, reset_user_role=True, keep_denied=True
+        await self.dyn_cache.update_channel(channel, locked=False)
+        transaction = OverwriteTransaction(voice_channel, None if skip_text else self.get_text_channel(channel))
+        transaction.set_voice(
+            remove_lock_overrides(
+                channel,
+                voice_channel,
+                voice_channel.overwrites,
+                keep_members=False,
+                reset_user_role=True,
+                keep_denied=True,
+            )
         )
-        overwrites = merge_permission_overwrites(
-            overwrites,
-            *[
-                (member, PermissionOverwrite(send_messages=True, add_reactions=True))
-                for member in voice_channel.members
-            ],
+        transaction.update_voice(
+            *[(member, PermissionOverwrite(send_messages=True, add_reactions=True)) for member in voice_channel.members]
         )
-
-        try:
-            await voice_channel.edit(overwrites=overwrites)
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(voice_channel.mention))
+        if transaction.text_channel:
+            transaction.set_text(
+                remove_lock_overrides(
+                    channel,
+                    voice_channel,
+                    transaction.text_channel.overwrites,
+                    keep_members=True,
+                    reset_user_role=False,
+                    keep_denied=True,
+                )
+            )
+        await transaction.commit()
 
         if skip_text:
             return
 
-        try:
-            if text_channel := self.get_text_channel(channel):
-                await text_channel.edit(
-                    overwrites=remove_lock_overrides(
-                        channel,
-                        voice_channel,
-                        text_channel.overwrites,
-                        keep_members=True,
-                        reset_user_role=False,
-                        keep_denied=True,
-                    )
-                )
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(text_channel.mention))
-
         await self.send_voice_msg(channel, t.voice_channel, [t.unlocked(member.mention)], force_new_embed=True)
 
-    async def change_channel_ping(self, member: Member, channel: DynChannel, *, no_ping: bool):
-        channel.no_ping = no_ping
+    async def change_channel_ping(self, member: Member, channel: CachedChannel, *, no_ping: bool):
+        await self.dyn_cache.update_channel(channel, no_ping=no_ping)
         if no_ping:
             await self.send_voice_msg(channel, t.voice_channel, [t.pings_disabled(member.mention)])
         else:
             await self.send_voice_msg(channel, t.voice_channel, [t.pings_enabled(member.mention)])
 
-    async def unhide_channel(self, member: Member, channel: DynChannel, voice_channel: VoiceChannel):
+    async def unhide_channel(self, member: Member, channel: CachedChannel, voice_channel: VoiceChannel):
         user_role = voice_channel.guild.get_role(channel.group.user_role)
 
         try:
@@ -775,44 +912,38 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         await self.send_voice_msg(channel, t.voice_channel, [t.visible(member.mention)])
 
-    async def add_to_channel(self, channel: DynChannel, voice_channel: VoiceChannel, members: list[Member]):
+    @staticmethod
+    def grant_access(transaction: OverwriteTransaction, members: list[Member]):
         overwrites = [
             (member, PermissionOverwrite(view_channel=True, connect=True, send_messages=True, add_reactions=True))
             for member in members
         ]
-        try:
-            await voice_channel.edit(overwrites=merge_permission_overwrites(voice_channel.overwrites, *overwrites))
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(voice_channel.mention))
+        transaction.update_voice(*overwrites)
+        transaction.update_text(*overwrites)
 
-        if text_channel := self.get_text_channel(channel):
-            try:
-                await text_channel.edit(overwrites=merge_permission_overwrites(text_channel.overwrites, *overwrites))
-            except Forbidden:
-                raise CommandError(t.could_not_overwrite_permissions(text_channel.mention))
+    async def add_to_channel(self, channel: CachedChannel, voice_channel: VoiceChannel, members: list[Member]):
+        transaction = OverwriteTransaction(voice_channel, self.get_text_channel(channel))
+        self.grant_access(transaction, members)
+        await transaction.commit()
 
         await self.send_voice_msg(channel, t.voice_channel, [t.user_added(member.mention) for member in members])
 
-    async def remove_from_channel(self, channel: DynChannel, voice_channel: VoiceChannel, members: list[Member]):
+    async def remove_from_channel(self, channel: CachedChannel, voice_channel: VoiceChannel, members: list[Member]):
         overwrites = [
             (member, PermissionOverwrite(view_channel=None, connect=False, send_messages=False, add_reactions=False))
             for member in members
         ]
-        try:
-            await voice_channel.edit(overwrites=merge_permission_overwrites(voice_channel.overwrites, *overwrites))
-        except Forbidden:
-            raise CommandError(t.could_not_overwrite_permissions(voice_channel.mention))
+        transaction = OverwriteTransaction(voice_channel, self.get_text_channel(channel))
+        transaction.update_voice(*overwrites)
+        transaction.update_text(*overwrites)
+        await transaction.commit()
 
-        if text_channel := self.get_text_channel(channel):
-            try:
-                await text_channel.edit(overwrites=merge_permission_overwrites(text_channel.overwrites, *overwrites))
-            except Forbidden:
-                raise CommandError(t.could_not_overwrite_permissions(text_channel.mention))
+        owner = await self.get_owner_from_cache(channel)
+        await self.dyn_cache.remove_members(channel, {member.id for member in members})
 
         is_owner_flag = False
         for member in members:
-            await db.exec(delete(DynChannelMember).filter_by(channel_id=voice_channel.id, member_id=member.id))
-            is_owner = member == await self.get_owner_from_cache(channel)
+            is_owner = member == owner
             if member.voice and member.voice.channel == voice_channel:
                 try:
                     await member.move_to(None)
@@ -820,7 +951,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                     await send_alert(member.guild, t.could_not_kick(member.mention, voice_channel.mention))
                     is_owner = False
                 else:
-                    self._recent_kicks.add((member, voice_channel))
+                    self.voice_events.mark_kicked(member, voice_channel)
             is_owner_flag = is_owner_flag or is_owner
 
         await self.send_voice_msg(channel, t.voice_channel, [t.user_removed(member.mention) for member in members])
@@ -828,7 +959,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             await self.fix_owner(channel)
 
     async def create_text_channel(
-        self, dyn_channel: DynChannel, voice_channel: VoiceChannel, ctx: Context = None
+        self, dyn_channel: CachedChannel, voice_channel: VoiceChannel, ctx: Context = None
     ) -> TextChannel | None:
         text_channel: TextChannel
         guild: Guild = voice_channel.guild
@@ -871,16 +1002,15 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             else:
                 await send_alert(voice_channel.guild, t.could_not_create_text_channel(voice_channel.mention, ""))
             return
-        dyn_channel.text_id = text_channel.id
+        await self.dyn_cache.update_channel(dyn_channel, text_id=text_channel.id)
 
-    async def member_join(self, member: Member, voice_channel: VoiceChannel):
+    async def member_join(self, member: Member, voice_channel: VoiceChannel, transaction: OverwriteTransaction):
         async with channel_locks[voice_channel.id]:
-            dyn_channel: DynChannel | None = await DynChannel.get(channel_id=voice_channel.id)
+            dyn_channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
             if not dyn_channel:
                 # check for extra logging when not dyn voice
-                if settings := (await VoiceChannelLog.get(channel_id=str(voice_channel.id)) or await VoiceChannelLog.get(channel_id=str(voice_channel.category.id))):
-                    if settings.mode & 1:
-                        await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_joined(member.mention)], add_controls=False)
+                if await self.voice_logs.get_mode(voice_channel) & 1:
+                    await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_joined(member.mention)], add_controls=False)
                 return
 
 
@@ -888,7 +1018,9 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             category: CategoryChannel | Guild = voice_channel.category or guild
 
             # create new
-            if all(c.members for chnl in dyn_channel.group.channels if (c := self.bot.get_channel(chnl.channel_id))):
+            if dyn_channel.group.spare_channels:
+                await self.refill_spare_channels(dyn_channel.group)
+            elif dyn_channel.group.occupied_channels == len(dyn_channel.group.channels):
                 overwrites = voice_channel.overwrites
                 if len(category.channels) >= 50:
                     await send_alert(voice_channel.guild, t.could_not_create_voice_channel(t.category_full))
@@ -905,88 +1037,69 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                         logger.warning(e.status_code, e.content)
                         await send_alert(voice_channel.guild, t.could_not_create_voice_channel(""))
                     else:
-                        await DynChannel.create(new_channel.id, dyn_channel.group_id)
+                        self.sync_occupancy(await self.dyn_cache.create_channel(new_channel.id, dyn_channel.group))
 
             # create text channel
             text_channel: TextChannel | None = self.bot.get_channel(dyn_channel.text_id)
             if not text_channel and dyn_channel.group.text_channel_by_default:
                 text_channel = await self.create_text_channel(dyn_channel, voice_channel)
 
-            if text_channel:
-                try:
-                    await text_channel.set_permissions(
-                        member,
-                        overwrite=PermissionOverwrite(read_messages=True, send_messages=True, add_reactions=True),
-                    )
-                except Forbidden:
-                    await send_alert(voice_channel.guild, t.could_not_overwrite_permissions(text_channel.mention))
-
+            transaction.text_channel = transaction.text_channel or text_channel
+            transaction.update_text(
+                (member, PermissionOverwrite(read_messages=True, send_messages=True, add_reactions=True))
+            )
             if not dyn_channel.locked:
-                await voice_channel.set_permissions(
-                    member, overwrite=PermissionOverwrite(send_messages=True, add_reactions=True)
-                )
+                transaction.update_voice((member, PermissionOverwrite(send_messages=True, add_reactions=True)))
+
             await self.send_voice_msg(dyn_channel, t.voice_channel, [t.dyn_voice_joined(member.mention)])
 
             # add member permissions
-            if dyn_channel.locked and member not in voice_channel.overwrites:
-                try:
-                    await self.add_to_channel(dyn_channel, voice_channel, [member])
-                except CommandError as e:
-                    await send_alert(voice_channel.guild, *e.args)
+            if dyn_channel.locked and member not in transaction.voice_overwrites:
+                self.grant_access(transaction, [member])
+                await self.send_voice_msg(dyn_channel, t.voice_channel, [t.user_added(member.mention)])
 
             # add member to db
-            channel_member: DynChannelMember | None = await db.get(
-                DynChannelMember, member_id=member.id, channel_id=voice_channel.id
-            )
+            channel_member: CachedMember | None = dyn_channel.get_member(member_id=member.id)
             if not channel_member:
-                dyn_channel.members.append(channel_member := await DynChannelMember.create(member.id, voice_channel.id))
+                channel_member = await self.dyn_cache.add_member(dyn_channel, member.id)
 
             # fix owner
-            owner: DynChannelMember | None = await db.get(DynChannelMember, id=dyn_channel.owner_id)
+            owner: CachedMember | None = dyn_channel.get_member(row_id=dyn_channel.owner_id)
             update_owner = False
             if (not owner or channel_member.timestamp < owner.timestamp) and dyn_channel.owner_id != channel_member.id:
                 if not member.bot:
-                    dyn_channel.owner_id = channel_member.id
+                    await self.dyn_cache.update_channel(dyn_channel, owner_id=channel_member.id)
                     update_owner = True
             if update_owner or dyn_channel.owner_override == member.id:
                 await self.cache_owner(dyn_channel, await self.fetch_owner_from_db(dyn_channel))
 
-    async def member_leave(self, member: Member, voice_channel: VoiceChannel):
+    async def member_leave(self, member: Member, voice_channel: VoiceChannel, transaction: OverwriteTransaction):
         async with channel_locks[voice_channel.id]:
-            dyn_channel: DynChannel | None = await DynChannel.get(channel_id=voice_channel.id)
+            dyn_channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
             if not dyn_channel:
                 # check for extra logging
-                if settings := (await VoiceChannelLog.get(channel_id=str(voice_channel.id)) or await VoiceChannelLog.get(channel_id=str(voice_channel.category.id))):
-                    if settings.mode & 2:
-                        await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_left(member.mention)], add_controls=False)
+                if await self.voice_logs.get_mode(voice_channel) & 2:
+                    await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_left(member.mention)], add_controls=False)
                 return 
 
             if not dyn_channel.locked:
-                text_channel: TextChannel | None = self.bot.get_channel(dyn_channel.text_id)
-                if text_channel:
-                    try:
-                        await text_channel.edit(
-                            overwrites=merge_permission_overwrites(
-                                text_channel.overwrites,
-                                (
-                                    member,
-                                    PermissionOverwrite(read_messages=None, send_messages=None, add_reactions=None),
-                                ),
-                            )
-                        )
-                    except Forbidden:
-                        await send_alert(voice_channel.guild, t.could_not_overwrite_permissions(text_channel.mention))
-                await voice_channel.edit(
-                    overwrites=merge_permission_overwrites(
-                        voice_channel.overwrites, (member, PermissionOverwrite(send_messages=None, add_reactions=None))
-                    )
+                transaction.update_text(
+                    (member, PermissionOverwrite(read_messages=None, send_messages=None, add_reactions=None))
                 )
+                transaction.update_voice((member, PermissionOverwrite(send_messages=None, add_reactions=None)))
             await self.send_voice_msg(dyn_channel, t.voice_channel, [t.dyn_voice_left(member.mention)])
 
-            owner: DynChannelMember | None = await db.get(DynChannelMember, id=dyn_channel.owner_id)
+            owner: CachedMember | None = dyn_channel.get_member(row_id=dyn_channel.owner_id)
             if owner and owner.member_id == member.id or dyn_channel.owner_override == member.id:
                 await self.fix_owner(dyn_channel)
 
+    async def cleanup_channel(self, dyn_channel: CachedChannel, voice_channel: VoiceChannel):
+        """Delete (or recycle) a dynamic voice channel after the last member has left."""
+
+        async with channel_locks[voice_channel.id]:
+            if self.dyn_cache.get(voice_channel.id) is not dyn_channel:
+                return
+
             if any(not m.bot for m in voice_channel.members):
                 return
 
@@ -999,10 +1112,9 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                         return
 
             async def delete_voice():
-                dyn_channel.owner_id = None
-                dyn_channel.owner_override = None
-                await db.exec(delete(DynChannelMember).filter_by(channel_id=voice_channel.id))
-                dyn_channel.members.clear()
+                await self.dyn_cache.update_channel(dyn_channel, owner_id=None, owner_override=None)
+                await self.dyn_cache.remove_members(dyn_channel)
+                await self.owners.set(dyn_channel.channel_id, None)
 
                 try:
                     await voice_channel.delete()
@@ -1010,15 +1122,11 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                     await send_alert(voice_channel.guild, t.could_not_delete_channel(voice_channel.mention))
                     return
                 else:
-                    await db.delete(dyn_channel)
+                    await self.dyn_cache.delete_channel(dyn_channel)
 
             async def create_new_channel() -> bool:
                 # check if there is at least one empty channel
-                if not all(
-                    any(not m.bot for m in c.members)
-                    for chnl in dyn_channel.group.channels
-                    if chnl.channel_id != dyn_channel.channel_id and (c := self.bot.get_channel(chnl.channel_id))
-                ):
+                if self.count_empty_channels(dyn_channel.group, exclude=dyn_channel):
                     return True
 
                 category: CategoryChannel | Guild = voice_channel.category or voice_channel.guild
@@ -1042,68 +1150,145 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                     await send_alert(guild, t.could_not_create_voice_channel)
                     return False
                 else:
-                    await DynChannel.create(new_channel.id, dyn_channel.group_id)
+                    self.sync_occupancy(await self.dyn_cache.create_channel(new_channel.id, dyn_channel.group))
                     return True
 
+            async def keep_as_spare() -> bool:
+                # locked channels are replaced by fresh ones
+                if dyn_channel.locked:
+                    return False
+
+                group: CachedGroup = dyn_channel.group
+                if self.count_empty_channels(group, exclude=dyn_channel) >= group.spare_channels:
+                    return False
+
+                # reset the member overwrites and the custom name of the previous owner, or delete the channel after all
+                guild: Guild = voice_channel.guild
+                transaction = OverwriteTransaction(voice_channel, None)
+                transaction.set_voice(
+                    remove_lock_overrides(
+                        dyn_channel, voice_channel, voice_channel.overwrites, keep_members=False, reset_user_role=False
+                    )
+                )
+                try:
+                    await transaction.commit()
+                    if voice_channel.name not in self.get_name_allocator(guild).names:
+                        await rename_channel(voice_channel, await self.get_channel_name(guild))
+                except (CommandError, HTTPException):
+                    return False
+
+                await self.dyn_cache.update_channel(dyn_channel, text_id=None, owner_id=None, owner_override=None)
+                await self.dyn_cache.remove_members(dyn_channel)
+                await self.owners.set(dyn_channel.channel_id, None)
+                return True
+
             await delete_text()
-            if await create_new_channel():
+            if dyn_channel.group.spare_channels and len(dyn_channel.group.channels) > 1:
+                if not await keep_as_spare():
+                    await delete_voice()
+            elif await create_new_channel():
                 await delete_voice()
 
+            if dyn_channel.group.spare_channels:
+                await self.refill_spare_channels(dyn_channel.group)
+
+    def count_empty_channels(self, group: CachedGroup, *, exclude: CachedChannel | None = None) -> int:
+        return group.empty_channels - bool(exclude and not exclude.connected_humans)
+
+    def sync_occupancy(self, channel: CachedChannel):
+        """Take the connected members of a dynamic voice channel from discord's voice states."""
+
+        members = voice_channel.members if (voice_channel := self.get_voice_channel(channel)) else []
+        self.dyn_cache.set_occupancy(channel, {m.id for m in members if not m.bot}, {m.id for m in members if m.bot})
+
+    @run_as_task
+    async def refill_spare_channels(self, group: CachedGroup):
+        """Create new channels in the background until the spare pool of a group is full again."""
+
+        async with spare_locks[group.id], db_context():
+            while group.id in self.dyn_cache.groups and self.count_empty_channels(group) < group.spare_channels:
+                templates = [(c, v) for c in group.channels if (v := self.bot.get_channel(c.channel_id))]
+                if not templates:
+                    return
+
+                # prefer unlocked channels as template for the permission overwrites
+                dyn_channel, voice_channel = min(templates, key=lambda x: x[0].locked)
+                guild: Guild = voice_channel.guild
+                category: CategoryChannel | Guild = voice_channel.category or guild
+                if len(category.channels) >= 50:
+                    await send_alert(guild, t.could_not_create_voice_channel(t.category_full))
+                    return
+
+                overwrites = voice_channel.overwrites
+                if dyn_channel.locked:
+                    overwrites = remove_lock_overrides(
+                        dyn_channel, voice_channel, overwrites, keep_members=False, reset_user_role=True
+                    )
+                try:
+                    new_channel = await safe_create_voice_channel(
+                        category, dyn_channel, await self.get_channel_name(guild), overwrites
+                    )
+                except (Forbidden, HTTPException):
+                    await send_alert(guild, t.could_not_create_voice_channel(""))
+                    return
+
+                self.sync_occupancy(await self.dyn_cache.create_channel(new_channel.id, group))
+
+    async def process_voice_events(self, voice_channel: VoiceChannel, events: list[VoiceEvent]):
+        """Process a batch of joins and leaves of a voice channel with one database session."""
+
+        async with channel_locks[voice_channel.id], db_context():
+            await self.refresh_dyn_cache()
+            dyn_channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
+            transaction = OverwriteTransaction(voice_channel, dyn_channel and self.get_text_channel(dyn_channel))
+
+            for event in events:
+                if not event.join:
+                    await self.member_leave(event.member, voice_channel, transaction)
+            for event in events:
+                if event.join:
+                    await self.member_join(event.member, voice_channel, transaction)
+
+            try:
+                await transaction.commit()
+            except CommandError as e:
+                await send_alert(voice_channel.guild, *e.args)
+
+            if dyn_channel and not all(event.join for event in events):
+                await self.cleanup_channel(dyn_channel, voice_channel)
+
     async def on_voice_state_update(self, member: Member, before: VoiceState, after: VoiceState):
         if before.suppress != after.suppress and (voice_channel := self.bot.get_channel(after.channel.id)):
-            if settings := (await VoiceChannelLog.get(channel_id=str(voice_channel.id)) or await VoiceChannelLog.get(channel_id=str(voice_channel.category.id))):
-                if settings.mode & 4:
-                    if after.suppress:
-                        await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_suppressed(member.mention)], add_controls=False)
-                    else:
-                        await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_unsuppressed(member.mention)], add_controls=False)
+            if await self.voice_logs.get_mode(voice_channel) & 4:
+                if after.suppress:
+                    await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_suppressed(member.mention)], add_controls=False)
+                else:
+                    await self.send_voice_msg(voice_channel, t.voice_channel, [t.dyn_voice_unsuppressed(member.mention)], add_controls=False)
 
         if before.channel == after.channel:
             return
 
-        async def delayed(delay, key, func, delay_callback, *args):
-            await asyncio.sleep(delay)
-            delay_callback()
-            async with channel_locks[key]:
-                async with db_context():
-                    return await func(*args)
-
-        async def create_task(delay, c, task_dict, cancel_dict, func):
-            dyn_channel: DynChannel | None = await DynChannel.get(channel_id=channel.id)
-            if dyn_channel:
-                new_key = dyn_channel.channel_id
-                await collect_links(member.guild, roles := set(), dyn_channel.group_id)
-                if func == self.member_leave:
-                    await update_roles(member, remove=roles)
-                else:
-                    await update_roles(member, add=roles)
-            else:
-                new_key = channel.id
-
-            key = member, c
-            if task := cancel_dict.pop(key, None):
-                task.cancel()
-            elif key not in task_dict:
-                task_dict[key] = asyncio.create_task(
-                    delayed(delay, new_key, func, lambda: task_dict.pop(key, None), *key)
-                )
+        await self.role_links.refresh()
+        await self.refresh_dyn_cache()
 
         remove: set[Role] = set()
         add: set[Role] = set()
 
         if channel := before.channel:
-            await collect_links(channel.guild, remove, str(channel.id))
-            if (k := (member, channel)) in self._recent_kicks:
-                self._recent_kicks.remove(k)
-                await self.member_leave(member, channel)
-            else:
-                await create_task(5, channel, self._leave_tasks, self._join_tasks, self.member_leave)
+            self.dyn_cache.voice_leave(channel.id, member.id, member.bot)
+            collect_links(channel.guild, remove, self.role_links.get(str(channel.id)))
+            if dyn_channel := self.dyn_cache.get(channel.id):
+                collect_links(channel.guild, remove, self.role_links.get(dyn_channel.group_id))
+            self.voice_events.push(member, channel, False, 5)
 
         if channel := after.channel:
-            await collect_links(channel.guild, add, str(channel.id))
-            await create_task(1, channel, self._join_tasks, self._leave_tasks, self.member_join)
+            self.dyn_cache.voice_join(channel.id, member.id, member.bot)
+            collect_links(channel.guild, add, self.role_links.get(str(channel.id)))
+            if dyn_channel := self.dyn_cache.get(channel.id):
+                collect_links(channel.guild, add, self.role_links.get(dyn_channel.group_id))
+            self.voice_events.push(member, channel, True, 1)
 
-        await update_roles(member, add=add, remove=remove)
+        update_roles(member, add=add, remove=remove)
 
     @commands.group(aliases=["vc"])
     @guild_only()
@@ -1147,16 +1332,15 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         embed = Embed(title=t.voice_channel, colour=Colors.Voice)
 
-        group: DynGroup
         group_data = []
-        async for group in await db.stream(select(DynGroup, DynGroup.channels)):
+        for group in [*self.dyn_cache.groups.values()]:
             idx = 0
             channels: list[tuple[str, VoiceChannel, TextChannel | None]] = []
-            for channel in group.channels:
+            for channel in [*group.channels]:
                 voice_channel: VoiceChannel | None = ctx.guild.get_channel(channel.channel_id)
                 text_channel: TextChannel | None = ctx.guild.get_channel(channel.text_id)
                 if not voice_channel:
-                    await db.delete(channel)
+                    await self.dyn_cache.delete_channel(channel)
                     continue
                 idx = voice_channel.category.position
 
@@ -1171,16 +1355,19 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                 channels.append((icon, voice_channel, text_channel))
 
             if not channels:
-                await db.delete(group)
+                await self.dyn_cache.delete_group(group)
                 continue
 
             group_data.append((idx, group, channels))
 
-        for data in sorted(group_data):
+        for data in sorted(group_data, key=lambda x: x[0]):
             _, group, channels = data
+            value = "\n".join(f":{icon}: {vc.mention} {txt.mention if txt else ''}" for icon, vc, txt in channels)
+            if group.spare_channels:
+                value += "\n" + t.spare_channels_active(cnt=group.spare_channels)
             embed.add_field(
                 name=t.cnt_channels(":memo:" if group.text_channel_by_default else "", cnt=len(channels)),
-                value="\n".join(f":{icon}: {vc.mention} {txt.mention if txt else ''}" for icon, vc, txt in channels),
+                value=value,
                 inline=False,
             )
 
@@ -1191,6 +1378,61 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             embed.set_footer(text=t.memo_meaning(name_to_emoji["memo"]))
         await send_long_embed(ctx, embed, paginate=True)
 
+    @voice_dynamic.command(name="stats")
+    @VoiceChannelPermission.dyn_read.check
+    @docs(t.commands.voice_dynamic_stats)
+    async def voice_dynamic_stats(self, ctx: Context):
+        writer = self.log_writer
+        events = self.voice_events
+        sync = self.role_sync
+        groups = self.dyn_cache.groups.values()
+        embed = Embed(title=t.voice_channel_stats, colour=Colors.Voice)
+        embed.add_field(
+            name=t.stats_occupancy,
+            value=t.stats_occupancy_value(
+                len(groups),
+                sum(len(group.channels) for group in groups),
+                sum(group.occupied_channels for group in groups),
+                sum(group.populated_channels for group in groups),
+                sum(group.connected_humans for group in groups),
+                sum(group.connected_bots for group in groups),
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name=t.stats_role_sync,
+            value=t.stats_role_sync_value(sync.done, sync.total, sync.failed, sync.stale_links, f"{sync.duration:.1f}"),
+            inline=False,
+        )
+        embed.add_field(
+            name=t.stats_voice_events,
+            value=t.stats_voice_events_value(
+                events.events_queued,
+                events.events_cancelled,
+                events.events_processed,
+                events.batches_processed,
+                f"{events.average_batch_size:.1f}",
+                f"{events.average_latency:.2f}",
+                events.depth,
+                events.peak_depth,
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name=t.stats_log_writer,
+            value=t.stats_log_writer_value(
+                writer.lines_written,
+                writer.batches_written,
+                f"{writer.average_batch_size:.1f}",
+                f"{writer.average_latency:.2f}",
+                writer.buffered_lines,
+                writer.peak_buffer,
+                writer.backpressure_flushes,
+            ),
+            inline=False,
+        )
+        await reply(ctx, embed=embed)
+
     @voice_dynamic.command(name="require_whitespaces", aliases=["rw"])
     @VoiceChannelPermission.dyn_write.check
     async def require_whitespaces(self, ctx: Context, enabled: bool):
@@ -1220,7 +1462,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             if not check_voice_permissions(voice_channel, user_role):
                 raise CommandError(t.invalid_user_role(user_role.mention if user_role != everyone else "@everyone"))
 
-            if await db.exists(filter_by(DynChannel, channel_id=voice_channel.id)):
+            if self.dyn_cache.get(voice_channel.id):
                 raise CommandError(t.dyn_group_already_exists)
 
             try:
@@ -1228,7 +1470,8 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             except Forbidden:
                 raise CommandError(t.cannot_edit)
 
-            await DynGroup.create(voice_channel.id, user_role.id, create_text_channel_by_default)
+            group = await self.dyn_cache.create_group(voice_channel.id, user_role.id, create_text_channel_by_default)
+            self.sync_occupancy(group.channels[0])
             embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.dyn_group_created)
             await reply(ctx, embed=embed)
             await send_to_changelog(
@@ -1244,9 +1487,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.dyn_write.check
     @docs(t.commands.voice_dynamic_remove)
     async def voice_dynamic_remove(self, ctx: Context, *, voice_channel: VoiceChannel):
-        channel: DynChannel | None = await db.get(
-            DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=voice_channel.id
-        )
+        channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
         if not channel:
             raise CommandError(t.dyn_group_not_found)
 
@@ -1262,7 +1503,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                 except Forbidden:
                     raise CommandError(t.could_not_delete_channel(x.mention))
 
-        await db.delete(channel.group)
+        await self.dyn_cache.delete_group(channel.group)
         embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.dyn_group_removed)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.log_dyn_group_removed)
@@ -1278,13 +1519,11 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.dyn_write.check
     @docs(t.commands.edit_default_text_channel)
     async def set_text_channel_default_mode(self, ctx: Context, active: bool, voice_channel: VoiceChannel):
-        channel: DynChannel | None = await db.get(
-            DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=voice_channel.id
-        )
+        channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
         if not channel:
             raise CommandError(t.dyn_group_not_found)
 
-        channel.group.text_channel_by_default = active
+        await self.dyn_cache.update_group(channel.group, text_channel_by_default=active)
         embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.dyn_group_edited)
         await reply(ctx, embed=embed)
         await send_to_changelog(
@@ -1292,24 +1531,46 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             t.log_dyn_group_edited(t.default_text_channels_active if active else t.default_text_channels_not_active),
         )
 
+    @voice_dynamic_edit.command(name="spare_channels", aliases=["spare"])
+    @VoiceChannelPermission.dyn_write.check
+    @docs(t.commands.edit_spare_channels)
+    async def set_spare_channels(self, ctx: Context, amount: int, voice_channel: VoiceChannel):
+        channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
+        if not channel:
+            raise CommandError(t.dyn_group_not_found)
+
+        if not 0 <= amount <= MAX_SPARE_CHANNELS:
+            raise CommandError(t.invalid_spare_channels(MAX_SPARE_CHANNELS))
+
+        await self.dyn_cache.set_spare_channels(channel.group, amount)
+        if amount:
+            await self.refill_spare_channels(channel.group)
+
+        embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.dyn_group_edited)
+        await reply(ctx, embed=embed)
+        await send_to_changelog(
+            ctx.guild,
+            t.log_dyn_group_edited(t.spare_channels_active(cnt=amount) if amount else t.spare_channels_not_active),
+        )
+
     @voice.command(name="help", aliases=["commands", "c"])
     @docs(t.commands.help)
     async def voice_help(self, ctx: Context):
         message = await reply(ctx, embed=await get_commands_embed())
 
-        if channel := await DynChannel.get(text_id=ctx.channel.id):
+        if channel := self.dyn_cache.get_by_text(ctx.channel.id):
             await self.update_control_message(channel, message)
-        if channel := await DynChannel.get(channel_id=ctx.channel.id):
+        if channel := self.dyn_cache.get(ctx.channel.id):
             await self.update_control_message(channel, message)
 
     @voice.command(name="info", aliases=["i"])
     @docs(t.commands.voice_info)
     async def voice_info(self, ctx: Context, *, voice_channel: VoiceChannel | Member | None = None):
         if not voice_channel:
-            if channel := await db.get(DynChannel, channel_id=ctx.channel.id):
+            if channel := self.dyn_cache.get(ctx.channel.id):
                 voice_channel = self.bot.get_channel(channel.channel_id)
             if not channel:
-                if channel := await db.get(DynChannel, text_id=ctx.channel.id):
+                if channel := self.dyn_cache.get_by_text(ctx.channel.id):
                     voice_channel = self.bot.get_channel(channel.channel_id)
 
         if not isinstance(voice_channel, VoiceChannel):  # no user given and voice channel not found yet
@@ -1322,9 +1583,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
                 raise CommandError(tg.permission_denied)  # given member not in voice and we are not teamler
             voice_channel = member.voice.channel
 
-        channel: DynChannel | None = await db.get(
-            DynChannel, [DynChannel.group, DynGroup.channels], DynChannel.members, channel_id=voice_channel.id
-        )
+        channel: CachedChannel | None = self.dyn_cache.get(voice_channel.id)
         if not channel:
             raise CommandError(t.dyn_group_not_found)
 
@@ -1333,7 +1592,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         await self.send_voice_info(ctx, channel)
 
-    async def send_voice_info(self, target: Messageable | InteractionResponse, dyn_channel: DynChannel):
+    async def send_voice_info(self, target: Messageable | InteractionResponse, dyn_channel: CachedChannel):
         voice_channel: VoiceChannel = self.bot.get_channel(dyn_channel.channel_id)
         if dyn_channel.locked:
             if voice_channel.overwrites_for(voice_channel.guild.get_role(dyn_channel.group.user_role)).view_channel:
@@ -1396,7 +1655,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         if not name:
             name = await self.get_channel_name(ctx.guild)
-        elif not self.check_name(name, False, await DynamicVoiceSettings.require_whitespaces.get())[0]:
+        elif not self.check_name(name, await DynamicVoiceSettings.require_whitespaces.get()):
             if not await VoiceChannelPermission.dyn_rename.check_permissions(ctx.author):
                 raise CommandError(t.no_custom_name(prefix=await get_prefix()))
 
@@ -1442,7 +1701,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
             if await self.get_owner_from_cache(channel) == member:
                 raise CommandError(t.already_owner(member.mention))
 
-            channel.owner_override = member.id
+            await self.dyn_cache.update_channel(channel, owner_override=member.id)
             await self.cache_owner(channel, member)
             await ctx.message.add_reaction(name_to_emoji["white_check_mark"])
 
@@ -1549,7 +1808,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
     @run_as_task
     @db_wrapper
-    async def request_join(self, ctx: Context, dyn_channel: DynChannel, voice_channel: VoiceChannel):
+    async def request_join(self, ctx: Context, dyn_channel: CachedChannel, voice_channel: VoiceChannel):
         async with join_requests[ctx.author.id]:
             await ctx.message.add_reaction(name_to_emoji["postal_horn"])
             owner = await self.get_owner_from_cache(dyn_channel)
@@ -1633,29 +1892,11 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         guild: Guild = ctx.guild
 
-        out: list[tuple[VoiceChannel, Role]] = []
-        link: RoleVoiceLink
-        async for link in await db.stream(select(RoleVoiceLink)):
-            role: Role | None = guild.get_role(link.role)
-            if role is None:
-                await db.delete(link)
-                continue
+        await self.role_links.refresh()
 
-            if link.voice_channel.isnumeric():
-                voice: VoiceChannel | None = guild.get_channel(int(link.voice_channel))
-                if not voice:
-                    await db.delete(link)
-                    continue
-                out.append((voice, role))
-            else:
-                group: DynGroup | None = await db.get(DynGroup, DynGroup.channels, id=link.voice_channel)
-                if not group:
-                    await db.delete(link)
-                    continue
-
-                for channel in group.channels:
-                    if voice := guild.get_channel(channel.channel_id):
-                        out.append((voice, role))
+        out: list[tuple[VoiceChannel, Role]] = [
+            (voice, role) for role, channels in (await self.resolve_role_links(guild)).items() for voice in channels
+        ]
 
         embed = Embed(title=t.voice_channel, color=Colors.Voice)
         embed.description = "\n".join(
@@ -1668,7 +1909,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         await send_long_embed(ctx, embed)
 
-    def gather_members(self, channel: DynChannel | None, voice_channel: VoiceChannel) -> set[Member]:
+    def gather_members(self, channel: CachedChannel | None, voice_channel: VoiceChannel) -> set[Member]:
         members: set[Member] = set(voice_channel.members)
         if not channel:
             return members
@@ -1683,20 +1924,21 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.link_write.check
     @docs(t.commands.voice_link_add)
     async def voice_link_add(self, ctx: Context, voice_channel: VoiceChannel, *, role: Role):
-        if channel := await DynChannel.get(channel_id=voice_channel.id):
+        if channel := self.dyn_cache.get(voice_channel.id):
             voice_id = channel.group_id
         else:
             voice_id = str(voice_channel.id)
 
-        if await db.exists(filter_by(RoleVoiceLink, role=role.id, voice_channel=voice_id)):
+        await self.role_links.refresh()
+        if self.role_links.exists(role.id, voice_id):
             raise CommandError(t.link_already_exists)
 
         check_role_assignable(role)
 
-        await RoleVoiceLink.create(role.id, voice_id)
+        await self.role_links.add(role.id, voice_id)
 
         for m in self.gather_members(channel, voice_channel):
-            asyncio.create_task(update_roles(m, add={role}))
+            update_roles(m, add={role})
 
         embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.link_created(voice_channel, role.id))
         await reply(ctx, embed=embed)
@@ -1706,19 +1948,19 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.link_write.check
     @docs(t.commands.voice_link_remove)
     async def voice_link_remove(self, ctx: Context, voice_channel: VoiceChannel, *, role: Role):
-        if channel := await DynChannel.get(channel_id=voice_channel.id):
+        if channel := self.dyn_cache.get(voice_channel.id):
             voice_id = channel.group_id
         else:
             voice_id = str(voice_channel.id)
 
-        link: RoleVoiceLink | None = await db.get(RoleVoiceLink, role=role.id, voice_channel=voice_id)
-        if not link:
+        await self.role_links.refresh()
+        if not self.role_links.exists(role.id, voice_id):
             raise CommandError(t.link_not_found)
 
-        await db.delete(link)
+        await self.role_links.remove([(role.id, voice_id)])
 
         for m in self.gather_members(channel, voice_channel):
-            asyncio.create_task(update_roles(m, remove={role}))
+            update_roles(m, remove={role})
 
         embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.link_deleted)
         await reply(ctx, embed=embed)
@@ -1735,15 +1977,19 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
 
         guild: Guild = ctx.guild
 
+        await self.voice_logs.refresh()
+
         out: list[tuple[VoiceChannel | CategoryChannel | StageChannel, int]] = []
-        db_channel: VoiceChannelLog
-        async for db_channel in await db.stream(select(VoiceChannelLog)):
-            channel: VoiceChannel | CategoryChannel | None = guild.get_channel(int(db_channel.channel_id))
+        stale_logs: list[int] = []
+        for channel_id, mode in self.voice_logs.modes.items():
+            channel: VoiceChannel | CategoryChannel | None = guild.get_channel(channel_id)
             if channel is None:
-                await db.delete(db_channel)
+                stale_logs.append(channel_id)
                 continue
 
-            out.append((channel, db_channel.mode))
+            out.append((channel, mode))
+
+        await self.voice_logs.remove(stale_logs)
 
         embed = Embed(title=t.voice_channel, color=Colors.Voice)
         embed.description = "\n".join(
@@ -1762,13 +2008,13 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.log_set.check
     @docs(f"{t.commands.voice_log_set}\n\n{t.voice_log_mode_explanation}")
     async def voice_log_set(self, ctx: Context, channel: VoiceChannel | CategoryChannel | StageChannel, mode: int):
-        if await DynChannel.get(channel_id=channel.id):
+        if self.dyn_cache.get(channel.id):
             raise CommandError(t.is_dynamic_voice)
 
         if not 0 <= mode <= 15:
             raise CommandError(t.log_mode_not_supported)
 
-        await VoiceChannelLog.create(str(channel.id), mode)
+        await self.voice_logs.set(channel.id, mode)
 
         if isinstance(channel, VoiceChannel) or isinstance(channel, StageChannel):
             embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.voice_log_created_channel(channel.mention, mode))
@@ -1783,14 +2029,14 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
     @VoiceChannelPermission.log_set.check
     @docs(t.commands.voice_log_remove)
     async def voice_log_remove(self, ctx: Context, channel: VoiceChannel | CategoryChannel | StageChannel):
-        if await DynChannel.get(channel_id=channel.id):
+        if self.dyn_cache.get(channel.id):
             raise CommandError(t.is_dynamic_voice)
 
-        db_channel: VoiceChannelLog | None = await db.get(VoiceChannelLog, channel_id=channel.id)
-        if not db_channel:
+        await self.voice_logs.refresh()
+        if channel.id not in self.voice_logs.modes:
             raise CommandError(t.log_not_found)
 
-        await db.delete(db_channel)
+        await self.voice_logs.remove([channel.id])
 
         if isinstance(channel, VoiceChannel) or isinstance(channel, StageChannel):
             embed = Embed(title=t.voice_channel, colour=Colors.Voice, description=t.voice_log_removed_channel(channel.mention))
@@ -1820,12 +2066,11 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         Depending on the target voice channel, you might need to separate the pars of this name by whitespaces.
         This command will ignore this requirement entirely.
         """
-        ok, all_name_fragments = self.check_name(name, False, False)
         embed = Embed(colour=Colors.Voice, title=t.voice_channel)
-        if not ok:
+        if not self.check_name(name, False):
             embed.description = t.name_no_matches(prefix=await get_prefix())
         else:
-            embed.description = t.name_matches(cnt=len(all_name_fragments))
+            embed.description = t.name_matches
         await ctx.reply(embed=embed)
 
     @whitelist.command(name="test_recursive", aliases=["check_recursive", "tr", "cr"])
@@ -1838,15 +2083,18 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         Depending on the target voice channel, you might need to separate the pars of this name by whitespaces.
         This command will ignore this requirement entirely.
         """
-        ok, all_name_fragments = self.check_name(name, True, False)
+        segmentation = self.split_name(name, False)
         embed = Embed(colour=Colors.Voice, title=t.voice_channel)
-        if not ok:
-            embed.description = t.name_no_matches
+        if not segmentation.count:
+            embed.description = t.name_no_matches(prefix=await get_prefix())
             await ctx.reply(embed=embed)
         else:
-            embed.description = t.name_matches_parts(cnt=len(all_name_fragments))
-            embed.set_footer(text=t.parts_footer_custom(prefix=await get_prefix()))
-            for i, combination in enumerate(all_name_fragments):
+            embed.description = t.name_matches_parts(cnt=segmentation.count)
+            footer = t.parts_footer_custom(prefix=await get_prefix())
+            if segmentation.count > MAX_NAME_COMBINATIONS:
+                footer = t.name_combinations_truncated(MAX_NAME_COMBINATIONS, segmentation.count) + "\n" + footer
+            embed.set_footer(text=footer)
+            for i, combination in enumerate(segmentation.segmentations(MAX_NAME_COMBINATIONS)):
                 embed.add_field(
                     name=t.name_match_combination(i + 1),
                     value="\n".join(map(lambda x: f"{x[0]}: {escape_codeblock(x[1])}", combination)),
@@ -1887,6 +2135,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         if await db.exists(filter_by(AllowedChannelName, name=name.lower())):
             raise CommandError(t.phrase_exists)
         self.custom_names.add(name)
+        self.name_matcher.add(name, "custom_database_names")
         await AllowedChannelName.create(name)
         embed = Embed(
             title=t.voice_channel, colour=Colors.Voice, description=t.phrase_whitelisted(escape_codeblock(name))
@@ -1909,6 +2158,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         if not (item := await db.get(AllowedChannelName, name=name.lower())):
             raise CommandError(t.phrase_not_existing)
         self.custom_names.remove(name)
+        self.name_matcher.remove(name, "custom_database_names")
         await db.delete(item)
         embed = Embed(
             title=t.voice_channel, colour=Colors.Voice, description=t.phrase_whitelist_removed(escape_codeblock(name))
@@ -1922,7 +2172,7 @@ class VoiceChannelCog(Cog, name="Voice Channels"):
         if ctx.author.id != 759537934873133076:
             raise CommandError("Only tnt2k can do this!")
 
-        phrases = list(sorted(set([p.lower() for v in self.allowed_names.values() for p in v])))
+        phrases = list(self.name_index.all_phrases)
         print(len(phrases))
         print(phrases.index("hebe"))
         channel_count = 0
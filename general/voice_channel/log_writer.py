@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable
+
+from discord import StageChannel, VoiceChannel
+
+from PyDrocsid.logger import get_logger
+from PyDrocsid.multilock import MultiLock
+
+from .cache import CachedChannel
+
+
+logger = get_logger(__name__)
+
+
+class LogBatch:
+    def __init__(self, channel: VoiceChannel | StageChannel, title: str, colour: int, force_new_embed: bool):
+        self.channel: VoiceChannel | StageChannel = channel
+        self.title: str = title
+        self.colour: int = colour
+        self.force_new_embed: bool = force_new_embed
+        self.lines: list[tuple[str, str]] = []
+        self.controls: CachedChannel | None = None
+        self.created: float = monotonic()
+
+
+class VoiceLogWriter:
+    """
+    Buffers the log lines of voice channels and writes all lines produced within a short time window at once.
+
+    Lines are written in order. A batch is flushed early if a line with a different title or colour is written, if a
+    new embed is requested or if the batch has reached the maximum size. In the latter case the writer waits until the
+    batch has been sent (backpressure).
+    """
+
+    def __init__(self, send: Callable[[LogBatch], Awaitable[None]], delay: float, max_lines: int):
+        self._send = send
+        self.delay = delay
+        self.max_lines = max_lines
+        self._pending: dict[int, LogBatch] = {}
+        self._locks = MultiLock[int]()
+
+        self.lines_written = 0
+        self.batches_written = 0
+        self.backpressure_flushes = 0
+        self.peak_buffer = 0
+        self.total_latency = 0.0
+
+    @property
+    def buffered_lines(self) -> int:
+        return sum(len(batch.lines) for batch in self._pending.values())
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.lines_written / self.batches_written if self.batches_written else 0
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.batches_written if self.batches_written else 0
+
+    async def write(
+        self,
+        channel: VoiceChannel | StageChannel,
+        title: str,
+        colour: int,
+        lines: list[tuple[str, str]],
+        *,
+        force_new_embed: bool = False,
+        controls: CachedChannel | None = None,
+    ) -> None:
+        """
+        Add log lines to the buffer of a voice channel.
+
+        :param channel: the voice channel to send the log to
+        :param title: the title of the log embed
+        :param colour: the colour of the log embed
+        :param lines: the (name, value) fields to add
+        :param force_new_embed: whether the lines must start a new embed
+        :param controls: the dynamic voice channel whose control message should be moved to the log message
+        """
+
+        while (batch := self._pending.get(channel.id)) and (
+            batch.title != title or batch.colour != colour or force_new_embed
+        ):
+            await self.flush(channel.id)
+
+        if not batch:
+            batch = self._pending[channel.id] = LogBatch(channel, title, colour, force_new_embed)
+            asyncio.create_task(self._flush_later(batch))
+
+        batch.lines += lines
+        batch.controls = controls or batch.controls
+        self.peak_buffer = max(self.peak_buffer, self.buffered_lines)
+
+        if len(batch.lines) >= self.max_lines:
+            self.backpressure_flushes += 1
+            await self.flush(channel.id)
+
+    async def _flush_later(self, batch: LogBatch) -> None:
+        await asyncio.sleep(self.delay)
+        if self._pending.get(batch.channel.id) is batch:
+            await self.flush(batch.channel.id)
+
+    async def flush(self, channel_id: int) -> None:
+        """Send the buffered lines of a voice channel."""
+
+        async with self._locks[channel_id]:
+            if not (batch := self._pending.pop(channel_id, None)):
+                return
+
+            try:
+                await self._send(batch)
+            except Exception as e:  # noqa: B902
+                logger.warning("could not write voice log in %s: %s", channel_id, e)
+
+            self.lines_written += len(batch.lines)
+            self.batches_written += 1
+            self.total_latency += monotonic() - batch.created
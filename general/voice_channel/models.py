@@ -69,6 +69,28 @@ class DynChannelMember(Base):
         return member
 
 
+class DynGroupSparePool(Base):
+    __tablename__ = "dynvoice_group_spare_pool"
+
+    group_id: Union[Column, str] = Column(String(36), primary_key=True, unique=True)
+    size: Union[Column, int] = Column(Integer)
+
+    @staticmethod
+    async def set(group_id: str, size: int) -> Optional[DynGroupSparePool]:
+        row = await db.get(DynGroupSparePool, group_id=group_id)
+        if not size:
+            if row:
+                await db.delete(row)
+            return None
+
+        if row:
+            row.size = size
+        else:
+            row = DynGroupSparePool(group_id=group_id, size=size)
+            await db.add(row)
+        return row
+
+
 class RoleVoiceLink(Base):
     __tablename__ = "role_voice_link"
 
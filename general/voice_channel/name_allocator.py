@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+from typing import Iterable
+
+
+class NameAllocator:
+    """Keeps track of the unused names of a name list and picks random unused names in constant time."""
+
+    def __init__(self, names: Iterable[str], used: Iterable[str]):
+        self.names: frozenset[str] = frozenset(names)
+        self._available: list[str] = []
+        self._index: dict[str, int] = {}
+        # number of channels which currently have a name of the list
+        self._used: Counter[str] = Counter(name for name in used if name in self.names)
+
+        for name in self.names - self._used.keys():
+            self._index[name] = len(self._available)
+            self._available.append(name)
+
+    def __len__(self) -> int:
+        return len(self._available)
+
+    def pick(self) -> str | None:
+        """Return a random unused name (or None if all names are in use)."""
+
+        return random.choice(self._available) if self._available else None
+
+    def use(self, name: str) -> None:
+        """Count a channel which has been given the name."""
+
+        if name not in self.names:
+            return
+
+        self._used[name] += 1
+        if (idx := self._index.pop(name, None)) is not None:
+            # move the last name into the gap
+            last = self._available.pop()
+            if last != name:
+                self._available[idx] = last
+                self._index[last] = idx
+
+    def release(self, name: str) -> None:
+        """Count a channel which no longer has the name."""
+
+        if not self._used[name]:
+            return
+
+        self._used[name] -= 1
+        if not self._used[name]:
+            del self._used[name]
+            self._index[name] = len(self._available)
+            self._available.append(name)
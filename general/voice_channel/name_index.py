@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+from .name_matcher import NameMatcher
+
+
+class NameIndex:
+    """
+    Compiled form of all name lists.
+
+    The index is compiled once per process and shared by all users of the same name lists, so it must not be modified.
+    Use a copy of the matcher to add further phrases.
+    """
+
+    def __init__(self, names: dict[str, tuple[str, ...]]):
+        self.names: dict[str, tuple[str, ...]] = names
+        self.phrases: dict[str, frozenset[str]] = {
+            name_list: frozenset(name.lower() for name in items) for name_list, items in names.items()
+        }
+        self.all_phrases: tuple[str, ...] = tuple(sorted(set().union(*self.phrases.values())))
+
+        self.matcher = NameMatcher()
+        for name_list, phrases in self.phrases.items():
+            for phrase in phrases:
+                self.matcher.add(phrase, name_list)
+        self.matcher.compile()
+
+    @staticmethod
+    def compile(files: list[Path]) -> NameIndex:
+        names: dict[str, tuple[str, ...]] = {}
+        for file in files:
+            with file.open() as f:
+                names[file.stem] = tuple(sorted({name for line in f if (name := line.strip())}))
+
+        return NameIndex(names)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def load(directory: Path) -> NameIndex:
+        """Load the compiled index of all name lists in a directory."""
+
+        return NameIndex.compile(sorted(path for path in directory.iterdir() if path.name.endswith(".txt")))
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterator
+
+
+class NameMatcher:
+    """Aho-Corasick automaton over all phrases which may be used to construct a voice channel name."""
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._dict: list[int] = [0]
+        self._depth: list[int] = [0]
+        self._sources: list[set[str]] = [set()]
+        self._dirty = False
+
+    def add(self, phrase: str, source: str) -> None:
+        """Add a phrase from the given name list to the automaton."""
+
+        if not phrase:
+            return
+
+        node = 0
+        for char in phrase:
+            if (nxt := self._goto[node].get(char)) is None:
+                nxt = self._goto[node][char] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._dict.append(0)
+                self._depth.append(self._depth[node] + 1)
+                self._sources.append(set())
+                self._dirty = True
+            node = nxt
+
+        if not self._sources[node]:
+            self._dirty = True
+        self._sources[node].add(source)
+
+    def remove(self, phrase: str, source: str) -> None:
+        """Remove a phrase of the given name list from the automaton."""
+
+        node = 0
+        for char in phrase:
+            if (node := self._goto[node].get(char)) is None:
+                return
+
+        self._sources[node].discard(source)
+        if not self._sources[node]:
+            self._dirty = True
+
+    def copy(self) -> NameMatcher:
+        """Return an independent copy of the automaton, so phrases can be added without affecting other users."""
+
+        out = NameMatcher()
+        out._goto = [goto.copy() for goto in self._goto]
+        out._fail = self._fail.copy()
+        out._dict = self._dict.copy()
+        out._depth = self._depth.copy()
+        out._sources = [sources.copy() for sources in self._sources]
+        out._dirty = self._dirty
+        return out
+
+    def compile(self) -> None:
+        """Compute the failure links now instead of before the next search."""
+
+        if self._dirty:
+            self._build()
+
+    def _build(self) -> None:
+        queue: deque[int] = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._dict[child] = fail if self._sources[fail] else self._dict[fail]
+                queue.append(child)
+
+        self._dirty = False
+
+    def find(self, text: str) -> list[list[tuple[int, set[str]]]]:
+        """
+        Find all occurrences of known phrases in a text.
+
+        :param text: the (lowercase) text to search in
+        :return: a list containing a list of (length, name lists) tuples for each start position in the text
+        """
+
+        self.compile()
+
+        out: list[list[tuple[int, set[str]]]] = [[] for _ in text]
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            match = node if self._sources[node] else self._dict[node]
+            while match:
+                out[i - self._depth[match] + 1].append((self._depth[match], self._sources[match]))
+                match = self._dict[match]
+
+        return out
+
+    def matches(self, text: str, require_whitespaces: bool) -> bool:
+        """Check whether a text can be constructed using only known phrases."""
+
+        if not text:
+            return False
+
+        n = len(text)
+        dp = [False] * n + [True]
+        for i, candidates in reversed(list(enumerate(self.find(text)))):
+            if text[i] == " " and dp[i + 1]:
+                dp[i] = True
+                continue
+
+            dp[i] = any(
+                dp[i + length] and (i + length == n or not require_whitespaces or text[i + length] == " ")
+                for length, _ in candidates
+            )
+
+        return dp[0]
+
+    def segment(self, text: str, require_whitespaces: bool) -> Segmentation:
+        """Build the segmentation DAG of a text."""
+
+        return Segmentation(text, self.find(text), require_whitespaces)
+
+
+class Segmentation:
+    """Memoized DAG of all ways to construct a text using known phrases."""
+
+    def __init__(self, text: str, candidates: list[list[tuple[int, set[str]]]], require_whitespaces: bool):
+        n = len(text)
+        self.text = text
+        self._edges: list[list[tuple[int, str | None]]] = [[] for _ in range(n + 1)]
+        self._counts: list[int] = [0] * n + [1]
+
+        for i in reversed(range(n)):
+            if text[i] == " " and self._counts[i + 1]:
+                # whitespaces between two phrases are skipped
+                self._edges[i] = [(i + 1, None)]
+            else:
+                self._edges[i] = [
+                    (i + length, source)
+                    for length, sources in candidates[i]
+                    if self._counts[i + length]
+                    and (i + length == n or not require_whitespaces or text[i + length] == " ")
+                    for source in sorted(sources)
+                ]
+            self._counts[i] = sum(self._counts[j] for j, _ in self._edges[i])
+
+    @property
+    def count(self) -> int:
+        """The total number of possible segmentations."""
+
+        return self._counts[0] if self.text else 0
+
+    def segmentations(self, limit: int | None = None) -> Iterator[list[tuple[str, str]]]:
+        """
+        Lazily enumerate the possible segmentations.
+
+        :param limit: the maximum number of segmentations to yield
+        :return: an iterator of lists of (name list, phrase) tuples
+        """
+
+        if not self.count:
+            return
+
+        stack: list[tuple[int, list[tuple[str, str]]]] = [(0, [])]
+        while stack and limit != 0:
+            pos, parts = stack.pop()
+            if pos == len(self.text):
+                yield parts
+                limit = limit and limit - 1
+                continue
+
+            for nxt, source in reversed(self._edges[pos]):
+                stack.append((nxt, parts if source is None else [*parts, (source, self.text[pos:nxt])]))
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from discord import Member, VoiceChannel
+
+from PyDrocsid.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class VoiceEvent:
+    def __init__(self, member: Member, channel: VoiceChannel, join: bool, delay: float):
+        self.member: Member = member
+        self.channel: VoiceChannel = channel
+        self.join: bool = join
+        self.created: float = monotonic()
+        self.due: float = self.created + delay
+
+
+class VoiceEventScheduler:
+    """
+    Per channel queue of delayed voice channel join and leave events.
+
+    A join and a leave of the same member in the same channel cancel each other out. Every channel with pending events
+    has a single worker, which processes all events that are due at the same time as one batch.
+    """
+
+    def __init__(self, process: Callable[[VoiceChannel, list[VoiceEvent]], Awaitable[None]]):
+        self._process = process
+        self._queues: dict[int, dict[int, VoiceEvent]] = {}
+        self._wakeups: dict[int, asyncio.Event] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._kicked: set[tuple[int, int]] = set()
+
+        self.events_queued = 0
+        self.events_cancelled = 0
+        self.events_processed = 0
+        self.batches_processed = 0
+        self.peak_depth = 0
+        self.total_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        return sum(map(len, self._queues.values()))
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.events_processed / self.batches_processed if self.batches_processed else 0
+
+    @property
+    def average_latency(self) -> float:
+        """The average time between the due time of an event and the start of its processing."""
+
+        return self.total_latency / self.events_processed if self.events_processed else 0
+
+    def mark_kicked(self, member: Member, channel: VoiceChannel) -> None:
+        """Process the next leave of a member in a channel without delay."""
+
+        self._kicked.add((member.id, channel.id))
+
+    def push(self, member: Member, channel: VoiceChannel, join: bool, delay: float) -> None:
+        if not join and (member.id, channel.id) in self._kicked:
+            self._kicked.remove((member.id, channel.id))
+            delay = 0
+
+        queue = self._queues.setdefault(channel.id, {})
+        if event := queue.get(member.id):
+            if event.join != join:
+                del queue[member.id]
+                self.events_cancelled += 2
+                self.events_queued += 1
+            return
+
+        queue[member.id] = VoiceEvent(member, channel, join, delay)
+        self.events_queued += 1
+        self.peak_depth = max(self.peak_depth, self.depth)
+
+        if channel.id in self._workers:
+            self._wakeups[channel.id].set()
+        else:
+            self._wakeups[channel.id] = asyncio.Event()
+            self._workers[channel.id] = asyncio.create_task(self._work(channel.id))
+
+    async def _work(self, channel_id: int) -> None:
+        queue = self._queues[channel_id]
+        wakeup = self._wakeups[channel_id]
+        try:
+            while queue:
+                now = monotonic()
+                if not (events := [event for event in queue.values() if event.due <= now]):
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), min(event.due for event in queue.values()) - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                for event in events:
+                    del queue[event.member.id]
+                    self.total_latency += now - event.due
+
+                try:
+                    await self._process(events[0].channel, events)
+                except Exception:  # noqa: B902
+                    logger.exception("could not process voice events in %s", channel_id)
+
+                self.events_processed += len(events)
+                self.batches_processed += 1
+        finally:
+            self._workers.pop(channel_id, None)
+            self._wakeups.pop(channel_id, None)
+            if not queue:
+                self._queues.pop(channel_id, None)
+
+
+class ChannelBatcher(Generic[T]):
+    """Collects items per channel and processes all items of a channel received within a short time window at once."""
+
+    def __init__(self, process: Callable[[int, list[T]], Awaitable[None]], delay: float):
+        self._process = process
+        self.delay = delay
+        self._pending: dict[int, list[T]] = {}
+
+        self.items_received = 0
+        self.batches_processed = 0
+
+    def push(self, channel_id: int, item: T) -> None:
+        self.items_received += 1
+        if channel_id in self._pending:
+            self._pending[channel_id].append(item)
+            return
+
+        self._pending[channel_id] = [item]
+        asyncio.create_task(self._process_later(channel_id))
+
+    async def _process_later(self, channel_id: int) -> None:
+        await asyncio.sleep(self.delay)
+
+        items = self._pending.pop(channel_id)
+        try:
+            await self._process(channel_id, items)
+        except Exception:  # noqa: B902
+            logger.exception("could not process batch of %s items in %s", len(items), channel_id)
+
+        self.batches_processed += 1
+
+
+class RoleSyncProgress:
+    """Progress of the role voice link reconciliation on startup."""
+
+    def __init__(self):
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.stale_links = 0
+        self._started: float | None = None
+        self._finished: float | None = None
+
+    @property
+    def duration(self) -> float:
+        if self._started is None:
+            return 0
+        return (self._finished or monotonic()) - self._started
+
+    def start(self, total: int) -> None:
+        self.total = total
+        self.done = self.failed = 0
+        self._started = monotonic()
+        self._finished = None
+
+    def finish(self) -> None:
+        self._finished = monotonic()
@@ -0,0 +1,117 @@
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from PyDrocsid.database import db
+from PyDrocsid.logger import get_logger
+from PyDrocsid.redis_client import redis
+
+
+logger = get_logger(__name__)
+
+# key in the info dict of a database session for the signals to bump once its transaction has been committed
+PENDING_SIGNALS = "invalidation_signals"
+
+_bumps: set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_pending_signals(session: Session) -> None:
+    signal: InvalidationSignal
+    for signal in session.info.pop(PENDING_SIGNALS, {}).values():
+        _bumps.add(task := asyncio.create_task(signal.bump()))
+        task.add_done_callback(_bumps.discard)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _invalidate_pending_signals(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is not None:
+        return
+
+    # the transaction has been rolled back, so the local caches contain changes which do not exist in the database
+    signal: InvalidationSignal
+    for signal in session.info.pop(PENDING_SIGNALS, {}).values():
+        signal.invalidate()
+
+
+class InvalidationSignal:
+    """
+    Cluster wide invalidation signal for in-process caches.
+
+    Each signal consists of a version counter in redis, which is incremented on every change, and a redis pub/sub
+    channel, which is used to announce these changes. A node only has to query the version counter after it has been
+    notified, so checking whether a local cache is still up to date is free most of the time.
+    """
+
+    def __init__(self, name: str):
+        self.key = f"invalidation:{name}"
+        self._version: str | None = None
+        self._notified = True
+        self._invalid = False
+        self._listener: asyncio.Task | None = None
+
+    async def _listen(self) -> None:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(self.key)
+            # changes may have happened before the subscription was active
+            self._notified = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._notified = True
+        except Exception as e:  # noqa: B902
+            logger.warning("invalidation listener for %s failed: %s", self.key, e)
+        finally:
+            self._notified = True
+            self._listener = None
+            await pubsub.reset()
+
+    async def sync(self) -> None:
+        """Remember the current version. Must be called before the local cache is (re)loaded."""
+
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+        self._notified = False
+        self._invalid = False
+        self._version = await redis.get(self.key)
+
+    async def is_stale(self) -> bool:
+        """Return whether the local cache has to be reloaded."""
+
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+        if self._invalid:
+            return True
+        if not self._notified:
+            return False
+
+        self._notified = False
+        return await redis.get(self.key) != self._version
+
+    async def bump(self) -> None:
+        """Announce a change to all nodes. The local cache is expected to be up to date already."""
+
+        version = await redis.incr(self.key)
+        if self._version is None and version == 1 or self._version is not None and int(self._version) + 1 == version:
+            # no other node has changed anything since the last sync
+            self._version = str(version)
+
+        await redis.publish(self.key, version)
+
+    def bump_after_commit(self) -> None:
+        """
+        Announce a change to all nodes once the transaction of the current database session has been committed.
+
+        Other nodes must not reload their caches before the changes are visible to them. If the transaction is rolled
+        back instead, the local cache is reloaded from the database before its next use.
+        """
+
+        db.session.sync_session.info.setdefault(PENDING_SIGNALS, {})[self.key] = self
+
+    def invalidate(self) -> None:
+        """Force the local cache to be reloaded, e.g. after its changes could not be committed."""
+
+        self._invalid = True
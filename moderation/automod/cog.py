@@ -12,7 +12,7 @@ from PyDrocsid.translations import t
 
 from .colors import Colors
 from .permissions import AutoModPermission
-from .settings import AutoKickMode, AutoModSettings
+from .settings import AutoKickMode, AutoModSettings, settings_snapshot
 from ...contributor import Contributor
 from ...pubsub import log_auto_kick, revoke_verification, send_alert, send_to_changelog
 
@@ -63,11 +63,11 @@ class AutoModCog(Cog, name="AutoMod"):
 
     async def get_autokick_role(self) -> Optional[Role]:
         guild: Guild = self.bot.guilds[0]
-        return guild.get_role(await AutoModSettings.autokick_role.get())
+        return guild.get_role((await settings_snapshot.get()).autokick_role)
 
     async def get_instantkick_role(self) -> Optional[Role]:
         guild: Guild = self.bot.guilds[0]
-        return guild.get_role(await AutoModSettings.instantkick_role.get())
+        return guild.get_role((await settings_snapshot.get()).instantkick_role)
 
     def cancel_task(self, member: Member):
         if member in self.kick_tasks:
@@ -77,12 +77,12 @@ class AutoModCog(Cog, name="AutoMod"):
         if member.bot:
             return
 
-        mode: int = await AutoModSettings.autokick_mode.get()
+        mode: int = (await settings_snapshot.get()).autokick_mode
         role: Optional[Role] = await self.get_autokick_role()
         if mode == 0 or role is None:
             return
 
-        delay: int = await AutoModSettings.autokick_delay.get()
+        delay: int = (await settings_snapshot.get()).autokick_delay
         self.kick_tasks[member] = asyncio.create_task(kick_delay(member, delay, role, mode == 2))
         self.kick_tasks[member].add_done_callback(lambda _: self.cancel_task(member))
 
@@ -105,7 +105,7 @@ class AutoModCog(Cog, name="AutoMod"):
                     pass
             return
 
-        mode: int = await AutoModSettings.autokick_mode.get()
+        mode: int = (await settings_snapshot.get()).autokick_mode
         if mode == 1 and role == await self.get_autokick_role():
             self.cancel_task(member)
 
@@ -113,7 +113,7 @@ class AutoModCog(Cog, name="AutoMod"):
         if member.bot:
             return
 
-        mode: int = await AutoModSettings.autokick_mode.get()
+        mode: int = (await settings_snapshot.get()).autokick_mode
         if mode == 2 and role == await self.get_autokick_role():
             self.cancel_task(member)
 
@@ -131,7 +131,7 @@ class AutoModCog(Cog, name="AutoMod"):
             return
 
         embed = Embed(title=t.autokick, colour=Colors.error)
-        mode: int = await AutoModSettings.autokick_mode.get()
+        mode: int = (await settings_snapshot.get()).autokick_mode
         role: Optional[Role] = await self.get_autokick_role()
         if mode == AutoKickMode.off or role is None:
             embed.add_field(name=tg.status, value=t.autokick_disabled, inline=False)
@@ -140,7 +140,7 @@ class AutoModCog(Cog, name="AutoMod"):
 
         embed.add_field(name=tg.status, value=t.autokick_mode[mode - 1], inline=False)
         embed.colour = Colors.AutoMod
-        delay: int = await AutoModSettings.autokick_delay.get()
+        delay: int = (await settings_snapshot.get()).autokick_delay
         embed.add_field(name=tg.delay, value=t.x_seconds(cnt=delay), inline=False)
         embed.add_field(name=tg.role, value=role.mention, inline=False)
 
@@ -162,7 +162,7 @@ class AutoModCog(Cog, name="AutoMod"):
             raise UserInputError
 
         mode: int = getattr(AutoKickMode, mode)
-        await AutoModSettings.autokick_mode.set(mode)
+        await settings_snapshot.set(AutoModSettings.autokick_mode, mode)
         embed = Embed(title=t.autokick, description=t.autokick_mode_configured[mode], colour=Colors.AutoMod)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.autokick_mode_configured[mode])
@@ -177,7 +177,7 @@ class AutoModCog(Cog, name="AutoMod"):
         if not 0 < seconds < 300:
             raise CommandError(tg.invalid_duration)
 
-        await AutoModSettings.autokick_delay.set(seconds)
+        await settings_snapshot.set(AutoModSettings.autokick_delay, seconds)
         embed = Embed(title=t.autokick, description=t.autokick_delay_configured, colour=Colors.AutoMod)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.log_autokick_delay_configured(cnt=seconds))
@@ -189,7 +189,7 @@ class AutoModCog(Cog, name="AutoMod"):
         configure autokick role
         """
 
-        await AutoModSettings.autokick_role.set(role.id)
+        await settings_snapshot.set(AutoModSettings.autokick_role, role.id)
         embed = Embed(title=t.autokick, description=t.autokick_role_configured, colour=Colors.AutoMod)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.log_autokick_role_configured(role.mention, role.id))
@@ -227,7 +227,7 @@ class AutoModCog(Cog, name="AutoMod"):
         disable instantkick
         """
 
-        await AutoModSettings.instantkick_role.reset()
+        await settings_snapshot.reset(AutoModSettings.instantkick_role)
         embed = Embed(title=t.instantkick, description=t.instantkick_set_disabled, colour=Colors.AutoMod)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.instantkick_set_disabled)
@@ -242,7 +242,7 @@ class AutoModCog(Cog, name="AutoMod"):
         if role >= ctx.me.top_role:
             raise CommandError(t.instantkick_cannot_kick)
 
-        await AutoModSettings.instantkick_role.set(role.id)
+        await settings_snapshot.set(AutoModSettings.instantkick_role, role.id)
         embed = Embed(title=t.instantkick, description=t.instantkick_role_configured, colour=Colors.AutoMod)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.log_instantkick_role_configured(role.mention, role.id))
@@ -1,5 +1,7 @@
 from PyDrocsid.settings import Settings
 
+from ...settings_snapshot import SettingsSnapshot
+
 
 class AutoKickMode:
     off = 0
@@ -12,3 +14,6 @@ class AutoModSettings(Settings):
     autokick_delay = 30
     autokick_role = -1
     instantkick_role = -1
+
+
+settings_snapshot = SettingsSnapshot(AutoModSettings)
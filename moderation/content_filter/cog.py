@@ -1,29 +1,54 @@
+import asyncio
 import re
+from collections import Counter
+from datetime import timedelta
+from time import monotonic
 
-from discord import Embed, Forbidden, Message
+from discord import Embed, Forbidden, Guild, HTTPException, Message, NotFound, Permissions
 from discord.ext import commands
-from discord.ext.commands import CommandError, Context, Converter, UserInputError, guild_only
+from discord.ext.commands import CommandError, Context, Converter, UserInputError, guild_only, max_concurrency
+from discord.utils import utcnow
 
 from PyDrocsid.cog import Cog
-from PyDrocsid.command import Confirmation, add_reactions, docs
+from PyDrocsid.command import Confirmation, add_reactions, docs, reply
 from PyDrocsid.database import db, filter_by, select
 from PyDrocsid.embeds import send_long_embed
 from PyDrocsid.emojis import name_to_emoji
 from PyDrocsid.environment import CACHE_TTL
 from PyDrocsid.events import StopEventHandling
+from PyDrocsid.logger import get_logger
 from PyDrocsid.redis_client import redis
 from PyDrocsid.translations import t
+from PyDrocsid.types import GuildMessageable
 
 from .colors import Colors
-from .models import BadWord, BadWordPost, sync_redis
+from .models import BadWord, BadWordPost, post_queue, rule_cache, sync_redis
 from .permissions import ContentFilterPermission
+from .rules import Rule, compile_rules, is_catastrophic
+from .sandbox import RegexSandbox, RegexTimeout, SandboxTimeout
 from ...contributor import Contributor
-from ...pubsub import get_userlog_entries, send_alert, send_to_changelog
+from ...pubsub import check_message_flood, get_userlog_entries, ignore_message_edit, send_alert, send_to_changelog
 
 
+logger = get_logger(__name__)
+
 tg = t.g
 t = t.content_filter
 
+SANDBOX_WORKERS = 2
+SANDBOX_TIMEOUT = 0.5
+
+# number of channels to read concurrently
+SIMULATE_CONCURRENCY = 10
+# number of candidate messages to evaluate in a single sandbox call
+SIMULATE_BATCH_SIZE = 20
+SIMULATE_SAMPLES = 10
+# simulations use their own sandbox, so they cannot delay the checks of new messages
+SIMULATE_SANDBOX_WORKERS = 1
+
+sandbox = RegexSandbox(SANDBOX_WORKERS, SANDBOX_TIMEOUT)
+simulate_sandbox = RegexSandbox(SIMULATE_SANDBOX_WORKERS, SANDBOX_TIMEOUT)
+
 
 class ContentFilterConverter(Converter):
     async def convert(self, ctx: Context, argument: str) -> BadWord:
@@ -45,11 +70,26 @@ class RegexConverter(Converter):
         except re.error:
             raise CommandError(t.invalid_regex)
 
+        if is_catastrophic(argument):
+            raise CommandError(t.catastrophic_regex)
+
         return argument
 
 
-def findall(regex: str, text: str) -> list[str]:
-    return [match[0] for match in re.finditer(regex, text)]
+async def findall_sandboxed(guild: Guild, regexes: list[str], text: str) -> dict[str, list[str]]:
+    """Evaluate content filter rules in the sandbox and quarantine every rule which exceeds the time budget."""
+
+    regexes = [*regexes]
+    while True:
+        try:
+            return await sandbox.findall(regexes, text)
+        except RegexTimeout as e:
+            regexes.remove(e.regex)
+            await rule_cache.quarantine(e.regex)
+            await send_alert(guild, t.regex_quarantined(e.regex, sandbox.timeout))
+        except SandboxTimeout:
+            logger.warning("content filter sandbox could not evaluate the regexes")
+            return {}
 
 
 async def get_new_matches(message_id: int, matches: set[str]) -> set[str]:
@@ -72,21 +112,18 @@ async def check_message(message: Message) -> None:
     if await ContentFilterPermission.bypass.check_permissions(author):
         return
 
-    violation_regexs: set[str] = set()
+    candidates = {rule.regex: rule for rule in (await rule_cache.get()).candidates(message.content)}
+    violations: list[Rule] = []
     violation_matches: set[str] = set()
-    for regex in await BadWord.get_all_redis():
-        if not (matches := findall(regex, message.content)):
-            continue
-
-        violation_regexs.add(regex)
+    for regex, matches in (await findall_sandboxed(message.guild, [*candidates], message.content)).items():
+        violations.append(candidates[regex])
         violation_matches.update(matches)
 
-    if not violation_regexs:
+    if not violations:
         return
 
-    bad_words: list[BadWord] = await db.all(select(BadWord).where(BadWord.regex.in_(violation_regexs)))
-    bad_word_ids: set[int] = {bad_word.id for bad_word in bad_words}
-    delete_message = any(bad_word.delete for bad_word in bad_words)
+    bad_word_ids: set[int] = {rule.id for rule in violations}
+    delete_message = any(rule.delete for rule in violations)
 
     was_deleted = False
     if delete_message:
@@ -114,7 +151,7 @@ async def check_message(message: Message) -> None:
         )
 
     for post in new_matches:
-        await BadWordPost.create(author.id, author.name, message.channel.id, post, was_deleted)
+        post_queue.push(author.id, author.name, message.channel.id, post, was_deleted)
 
     if was_deleted:
         raise StopEventHandling
@@ -122,6 +159,121 @@ async def check_message(message: Message) -> None:
     await message.add_reaction(name_to_emoji["warning"])
 
 
+async def simulate(ctx: Context, regex: str, days: int) -> None:
+    async def update_msg(content: str):
+        embed.description = content
+        embed.timestamp = utcnow()
+        await ignore_message_edit(message[0])
+        try:
+            await message[0].edit(embed=embed)
+        except NotFound:
+            message[0] = await reply(ctx, embed=embed)
+
+    embed = Embed(title=t.simulating, colour=Colors.ContentFilter, timestamp=utcnow())
+    message: list[Message] = [await reply(ctx, embed=embed)]
+    rules = compile_rules(((None, regex, False),))
+    after = utcnow() - timedelta(days=days)
+    started = monotonic()
+
+    scanned = candidates = hits = 0
+    matches: Counter[str] = Counter()
+    samples: list[str] = []
+    active: set[GuildMessageable] = set()
+    completed: list[GuildMessageable] = []
+    skipped: list[GuildMessageable] = []
+
+    async def update_progress_message():
+        while len(completed) < len(channels):
+            content = t.simulating_channel(len(completed), len(channels), scanned, hits, cnt=len(active))
+            for a in active:
+                content += f"\n:small_orange_diamond: {a.mention}"
+            await update_msg(content)
+            await asyncio.sleep(2)
+
+    async def check_batch(batch: list[Message]):
+        nonlocal hits
+
+        results = await simulate_sandbox.findall_batch([regex], [msg.content for msg in batch])
+        for msg, result in zip(batch, results):
+            if not (found := result.get(regex)):
+                continue
+
+            hits += 1
+            matches.update(found)
+            if len(samples) < SIMULATE_SAMPLES:
+                samples.append(msg.jump_url)
+
+    async def scan_channel(c: GuildMessageable):
+        nonlocal scanned, candidates
+
+        async with semaphore:
+            active.add(c)
+            batch: list[Message] = []
+            try:
+                async for msg in c.history(limit=None, after=after):
+                    scanned += 1
+                    if not rules.candidates(msg.content):
+                        continue
+
+                    candidates += 1
+                    batch.append(msg)
+                    if len(batch) >= SIMULATE_BATCH_SIZE:
+                        await check_batch(batch)
+                        batch = []
+            except (Forbidden, HTTPException):
+                skipped.append(c)
+
+            if batch:
+                await check_batch(batch)
+
+            active.remove(c)
+            completed.append(c)
+
+    channels: list[GuildMessageable] = []
+    for channel in ctx.guild.text_channels:
+        permissions: Permissions = channel.permissions_for(ctx.me)
+        if permissions.read_messages and permissions.read_message_history:
+            channels.append(channel)
+
+    semaphore = asyncio.Semaphore(SIMULATE_CONCURRENCY)
+    task = asyncio.create_task(update_progress_message())
+    scans = [asyncio.create_task(scan_channel(channel)) for channel in channels]
+    try:
+        await asyncio.gather(*scans)
+    except RegexTimeout as e:
+        raise CommandError(t.regex_timeout(e.regex, simulate_sandbox.timeout))
+    except SandboxTimeout:
+        raise CommandError(t.sandbox_timeout)
+    finally:
+        # gather does not cancel the remaining scans if one of them fails
+        for scan in scans:
+            scan.cancel()
+        task.cancel()
+
+    duration = monotonic() - started
+    await update_msg(t.simulation_complete(cnt=len(channels)))
+
+    embed = Embed(title=t.simulation_result, description=f"`{regex}`", colour=Colors.ContentFilter)
+    embed.add_field(name=t.hits, value=t.hits_value(hits, scanned, days, candidates), inline=False)
+    embed.add_field(name=t.throughput, value=t.throughput_value(scanned / max(duration, 1e-3), duration), inline=False)
+    if matches:
+        embed.add_field(
+            name=t.top_matches,
+            value="\n".join(f"`{match}` ({cnt}x)" for match, cnt in matches.most_common(SIMULATE_SAMPLES)),
+            inline=False,
+        )
+    if samples:
+        embed.add_field(
+            name=t.sample_messages,
+            value="\n".join(f"[{t.message} {i}]({url})" for i, url in enumerate(samples, 1)),
+            inline=False,
+        )
+    if skipped:
+        embed.add_field(name=t.skipped_channels, value=", ".join(c.mention for c in skipped), inline=False)
+
+    await send_long_embed(ctx, embed)
+
+
 class ContentFilterCog(Cog, name="Content Filter"):
     CONTRIBUTORS = [Contributor.Infinity, Contributor.Defelo]
 
@@ -136,9 +288,27 @@ class ContentFilterCog(Cog, name="Content Filter"):
             else:
                 out.append((log.timestamp, t.ulog_message(log.content, log.channel)))
 
+        for row in post_queue.pending(user_id):
+            if row["deleted_message"]:
+                out.append((row["timestamp"], t.ulog_message_deleted(row["content"], row["channel"])))
+            else:
+                out.append((row["timestamp"], t.ulog_message(row["content"], row["channel"])))
+
         return out
 
+    def cog_unload(self):
+        # cog_unload cannot be a coroutine, the remaining violation records are written in the background
+        post_queue.flush_soon()
+
+    async def on_ready(self):
+        await sandbox.start()
+        await simulate_sandbox.start()
+
     async def on_message(self, message: Message):
+        # message floods are handled before the more expensive content filter, regardless of the order of the cogs
+        if await check_message_flood(message):
+            raise StopEventHandling
+
         await check_message(message)
 
     async def on_message_edit(self, _, after: Message):
@@ -155,14 +325,14 @@ class ContentFilterCog(Cog, name="Content Filter"):
             return
 
         embed = Embed(title=t.bad_word_list_header, colour=Colors.ContentFilter)
+        await rule_cache.get()
 
         reg: BadWord
         async for reg in await db.stream(select(BadWord)):
-            embed.add_field(
-                name=t.embed_field_name(reg.id, reg.description),
-                value=t.embed_field_value(reg.regex, t.delete if reg.delete else t.not_delete),
-                inline=False,
-            )
+            value = t.embed_field_value(reg.regex, t.delete if reg.delete else t.not_delete)
+            if reg.regex in rule_cache.quarantined:
+                value += "\n" + t.quarantined
+            embed.add_field(name=t.embed_field_name(reg.id, reg.description), value=value, inline=False)
 
         if not embed.fields:
             embed.colour = Colors.error
@@ -240,6 +410,7 @@ class ContentFilterCog(Cog, name="Content Filter"):
     async def delete_message(self, ctx: Context, pattern: ContentFilterConverter, delete: bool):
         pattern: BadWord
         pattern.delete = delete
+        await sync_redis()
 
         await add_reactions(ctx.message, "white_check_mark")
         await send_to_changelog(ctx.guild, t.log_delete_updated(pattern.delete, pattern.regex))
@@ -256,10 +427,19 @@ class ContentFilterCog(Cog, name="Content Filter"):
         else:
             raise CommandError(t.invalid_pattern)
 
+        try:
+            results = await sandbox.findall(
+                [rule.regex if isinstance(rule, BadWord) else rule for rule in filters], test_string
+            )
+        except RegexTimeout as e:
+            raise CommandError(t.regex_timeout(e.regex, sandbox.timeout))
+        except SandboxTimeout:
+            raise CommandError(t.sandbox_timeout)
+
         out = []
         for rule in filters:
             regex = rule.regex if isinstance(rule, BadWord) else rule
-            if not (matches := findall(regex, test_string)):
+            if not (matches := results.get(regex)):
                 continue
 
             line = f"{rule.id}: " if isinstance(rule, BadWord) else ""
@@ -270,3 +450,13 @@ class ContentFilterCog(Cog, name="Content Filter"):
         embed.add_field(name=t.matches, value="\n".join(out) or t.no_matches)
 
         await send_long_embed(ctx, embed, paginate=True)
+
+    @content_filter.command(name="simulate", aliases=["sim"])
+    @ContentFilterPermission.read.check
+    @max_concurrency(1)
+    @docs(t.commands.simulate)
+    async def simulate(self, ctx: Context, pattern: ContentFilterConverter | RegexConverter, days: int):
+        if days <= 0:
+            raise CommandError(tg.invalid_duration)
+
+        await simulate(ctx, pattern.regex if isinstance(pattern, BadWord) else pattern, days)
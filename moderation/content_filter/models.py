@@ -1,32 +1,188 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from datetime import datetime
-from typing import Union
+from typing import Iterable, Union
 
 from discord.utils import utcnow
-from sqlalchemy import BigInteger, Boolean, Column, Integer, Text
+from sqlalchemy import BigInteger, Boolean, Column, Integer, Text, insert
 
-from PyDrocsid.database import Base, UTCDateTime, db, select
+from PyDrocsid.database import Base, UTCDateTime, db, db_context, select
 from PyDrocsid.environment import CACHE_TTL
+from PyDrocsid.logger import get_logger
 from PyDrocsid.redis_client import redis
 
+from .rules import RuleSet, RuleSpec, compile_rules
+from ...invalidation import InvalidationSignal
 
-async def sync_redis() -> list[str]:
-    out = []
+
+logger = get_logger(__name__)
+
+RULES_KEY = "content_filter:rules"
+QUARANTINE_KEY = "content_filter:quarantine"
+
+# violation records are written to the database after this many seconds or as soon as this many records are pending
+POST_FLUSH_INTERVAL = 2
+POST_FLUSH_SIZE = 100
+# maximum number of records to keep for a retry if they could not be written to the database
+POST_MAX_PENDING = 1000
+
+
+class RuleCache:
+    """
+    Process local copy of the compiled content filter rules.
+
+    The rules are only reloaded from redis after another node has announced a change, so checking a message does not
+    need any redis round trips in the steady state. Quarantined rules (regexes which exceeded the time budget of the
+    sandbox) are excluded.
+    """
+
+    def __init__(self):
+        self.signal = InvalidationSignal("content_filter")
+        self.quarantined: set[str] = set()
+        self._rules: RuleSet | None = None
+
+    def _compile(self, specs: Iterable[RuleSpec]) -> None:
+        self._rules = compile_rules(tuple(spec for spec in specs if spec[1] not in self.quarantined))
+
+    async def get(self) -> RuleSet:
+        if self._rules is None or await self.signal.is_stale():
+            await self.signal.sync()
+            self.quarantined = set(await redis.smembers(QUARANTINE_KEY))
+            self._compile(await BadWord.get_all_redis())
+
+        return self._rules
+
+    async def set(self, specs: list[RuleSpec]) -> None:
+        # regexes which have been removed or changed are no longer quarantined
+        if stale := self.quarantined.difference(regex for _, regex, _ in specs):
+            await redis.srem(QUARANTINE_KEY, *stale)
+            self.quarantined -= stale
+
+        self._compile(specs)
+        await self.signal.bump()
+
+    async def quarantine(self, regex: str) -> None:
+        """Disable a rule on all nodes."""
+
+        await redis.sadd(QUARANTINE_KEY, regex)
+        self.quarantined.add(regex)
+        if self._rules:
+            self._compile(rule.spec for rule in self._rules.rules)
+        await self.signal.bump()
+
+
+rule_cache = RuleCache()
+
+
+class BadWordPostQueue:
+    """
+    Buffer for violation records.
+
+    Instead of one transaction per record, all records which are created within a short time window (e.g. during a
+    spam wave) are written to the database with a single bulk insert.
+    """
+
+    def __init__(self, interval: float, size: int, max_pending: int):
+        self.interval = interval
+        self.size = size
+        self.max_pending = max_pending
+        self._rows: list[dict] = []
+        self._scheduled = False
+        # references to the running flushes, so they are not garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+        self.rows_written = 0
+        self.flushes = 0
+
+    def push(self, member: int, member_name: str, channel: int, content: str, deleted: bool) -> None:
+        self._rows.append(
+            {
+                "member": member,
+                "member_name": member_name,
+                "channel": channel,
+                "content": content,
+                "deleted_message": deleted,
+                "timestamp": utcnow(),
+            }
+        )
+
+        if len(self._rows) >= self.size:
+            self._run(self.flush())
+        else:
+            self._schedule()
+
+    def pending(self, member: int) -> list[dict]:
+        """Return the records of a member which have not been written to the database yet."""
+
+        return [row for row in self._rows if row["member"] == member]
+
+    def _run(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            self._run(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._scheduled = False
+        await self.flush()
+
+    def flush_soon(self) -> None:
+        """Write all pending records in the background, e.g. when the cog is unloaded."""
+
+        self._run(self.flush())
+
+    def _requeue(self, rows: list[dict]) -> None:
+        self._rows = rows + self._rows
+        if (overflow := len(self._rows) - self.max_pending) > 0:
+            dropped, self._rows = self._rows[:overflow], self._rows[overflow:]
+            logger.error("dropped %s content filter violations: %r", len(dropped), dropped)
+
+        self._schedule()
+
+    async def flush(self) -> None:
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+
+        try:
+            async with db_context():
+                await db.exec(insert(BadWordPost).values(rows))
+        except Exception:  # noqa: B902
+            logger.exception("could not write %s content filter violations, retrying later", len(rows))
+            self._requeue(rows)
+            return
+
+        self.rows_written += len(rows)
+        self.flushes += 1
+
+
+post_queue = BadWordPostQueue(POST_FLUSH_INTERVAL, POST_FLUSH_SIZE, POST_MAX_PENDING)
+
+
+async def sync_redis() -> list[RuleSpec]:
+    out: list[RuleSpec] = []
 
     async with redis.pipeline() as pipe:
-        await pipe.delete(key := "content_filter")
+        await pipe.delete(key := RULES_KEY)
 
         regex: BadWord
         async for regex in await db.stream(select(BadWord)):
-            out.append(regex.regex)
-            await pipe.lpush(key, regex.regex)
+            out.append(spec := (regex.id, regex.regex, regex.delete))
+            await pipe.lpush(key, json.dumps(spec))
 
         await pipe.lpush(key, "")
         await pipe.expire(key, CACHE_TTL)
 
         await pipe.execute()
 
+    await rule_cache.set(out)
     return out
 
 
@@ -51,9 +207,9 @@ class BadWord(Base):
         await sync_redis()
 
     @staticmethod
-    async def get_all_redis() -> list[str]:
-        if out := await redis.lrange("content_filter", 0, -1):
-            return [x for x in out if x]
+    async def get_all_redis() -> list[RuleSpec]:
+        if out := await redis.lrange(RULES_KEY, 0, -1):
+            return [tuple(json.loads(x)) for x in out if x]
 
         return await sync_redis()
 
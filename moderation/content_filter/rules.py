@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable
+
+from PyDrocsid.logger import get_logger
+
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+logger = get_logger(__name__)
+
+# maximum number of strings to track for a (sub)pattern which only matches a few fixed strings
+MAX_ALTERNATIVES = 16
+# maximum number of characters to expand for a character class
+MAX_CLASS_SIZE = 8
+
+# case insensitive matching treats these characters like their ascii counterparts, but str.casefold does not
+FOLD_FIXES = str.maketrans({"İ": "i", "ı": "i"})
+
+Literals = frozenset[str]
+# id, regex and delete flag of a content filter rule (the id is None for ad hoc regexes)
+RuleSpec = tuple[int | None, str, bool]
+
+
+def fold(text: str) -> str:
+    """Normalize the case of a text. A pattern can only match a text if its literals occur in the folded text."""
+
+    return text.translate(FOLD_FIXES).casefold()
+
+
+class _Info:
+    def __init__(self, exact: set[str] | None, required: Literals | None):
+        # all strings the pattern can match, if there are only a few of them
+        self.exact: set[str] | None = exact
+        # every match contains at least one of these strings
+        self.required: Literals | None = required
+
+
+def _score(literals: Literals | None) -> int:
+    return min(map(len, literals)) if literals else 0
+
+
+def _better(a: Literals | None, b: Literals | None) -> Literals | None:
+    """Return the more selective requirement, i.e. the one whose shortest literal is longer."""
+
+    if _score(b) > _score(a) or _score(b) == _score(a) and b and a and len(b) < len(a):
+        a = b
+    return a if _score(a) else None
+
+
+def _product(a: set[str] | None, b: set[str] | None) -> set[str] | None:
+    if a is None or b is None or len(a) * len(b) > MAX_ALTERNATIVES:
+        return None
+    return {x + y for x in a for y in b}
+
+
+def _literal(char: int, flags: int) -> _Info:
+    c = chr(char)
+    if flags & re.IGNORECASE and not c.isascii():
+        # non ascii characters have case insensitive equivalents which cannot be derived from str.casefold
+        return _Info(None, None)
+
+    return _Info({fold(c)}, None)
+
+
+def _char_class(items: list, flags: int) -> _Info:
+    chars: set[str] = set()
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op == sre_constants.RANGE and av[1] - av[0] < MAX_CLASS_SIZE:
+            chars.update(map(chr, range(av[0], av[1] + 1)))
+        else:
+            return _Info(None, None)
+
+        if len(chars) > MAX_CLASS_SIZE:
+            return _Info(None, None)
+
+    exact = set()
+    for c in chars:
+        if (info := _literal(ord(c), flags)).exact is None:
+            return _Info(None, None)
+        exact |= info.exact
+
+    return _Info(exact, None)
+
+
+def _branch(branches: list, flags: int) -> _Info:
+    infos = [_sequence(branch, flags) for branch in branches]
+
+    exact: set[str] | None = set()
+    for info in infos:
+        exact = exact | info.exact if exact is not None and info.exact is not None else None
+    if exact is not None and len(exact) > MAX_ALTERNATIVES:
+        exact = None
+
+    required: set[str] = set()
+    for info in infos:
+        if not (literals := info.required or info.exact) or "" in literals:
+            return _Info(exact, None)
+        required |= literals
+
+    return _Info(exact, frozenset(required))
+
+
+def _node(op, av, flags: int) -> _Info:
+    if op == sre_constants.LITERAL:
+        return _literal(av, flags)
+    if op == sre_constants.IN:
+        return _char_class(av, flags)
+    if op == sre_constants.BRANCH:
+        return _branch(av[1], flags)
+    if op == sre_constants.SUBPATTERN:
+        _, add_flags, del_flags, pattern = av
+        return _sequence(pattern, (flags | add_flags) & ~del_flags)
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _sequence(av, flags)
+    if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # zero width assertions do not consume any characters
+        return _Info({""}, None)
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+        lo, hi, pattern = av
+        info = _sequence(pattern, flags)
+        if lo == hi == 1:
+            return info
+        if lo == 0:
+            return _Info(None, None)
+        return _Info(None, _better(info.required, frozenset(info.exact) if info.exact is not None else None))
+
+    # any character, negated literals, categories, backreferences, conditionals
+    return _Info(None, None)
+
+
+def _sequence(pattern, flags: int) -> _Info:
+    exact: set[str] | None = {""}
+    run: set[str] = {""}
+    required: Literals | None = None
+
+    for op, av in pattern:
+        info = _node(op, av, flags)
+        exact = _product(exact, info.exact)
+        if (nxt := _product(run, info.exact)) is not None:
+            run = nxt
+            continue
+
+        # the current run of fixed strings ends here
+        required = _better(required, frozenset(run))
+        required = _better(required, info.required)
+        run = info.exact if info.exact is not None else {""}
+
+    return _Info(exact, _better(required, frozenset(run)))
+
+
+def extract_literals(regex: str) -> Literals | None:
+    """
+    Extract the mandatory literals of a regex.
+
+    Returns a set of folded strings such that the folded text contains at least one of them whenever the regex
+    matches the text, or None if no such set could be found.
+    """
+
+    try:
+        pattern = sre_parse.parse(regex)
+        return _sequence(pattern, pattern.state.flags).required
+    except (re.error, RecursionError):
+        return None
+
+
+def _nested_quantifiers(pattern, repeated: bool) -> bool:
+    for op, av in pattern:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            unbounded = av[1] == sre_constants.MAXREPEAT
+            if repeated and unbounded or _nested_quantifiers(av[2], repeated or unbounded):
+                return True
+        elif op == getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+            # possessive quantifiers and atomic groups never backtrack into their contents
+            if _nested_quantifiers(av[2], False):
+                return True
+        elif op == getattr(sre_constants, "ATOMIC_GROUP", None):
+            if _nested_quantifiers(av, False):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _nested_quantifiers(av[3], repeated):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_nested_quantifiers(branch, repeated) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _nested_quantifiers(av[1], repeated):
+                return True
+
+    return False
+
+
+def is_catastrophic(regex: str) -> bool:
+    """Check whether a regex contains nested unbounded quantifiers like (a+)+, which may backtrack exponentially."""
+
+    try:
+        return _nested_quantifiers(sre_parse.parse(regex), False)
+    except RecursionError:
+        return True
+
+
+class LiteralMatcher:
+    """Aho-Corasick automaton which finds all occurrences of a set of literals in a single pass over a text."""
+
+    def __init__(self, literals: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[str]] = [frozenset()]
+
+        for literal in literals:
+            node = 0
+            for char in literal:
+                if (nxt := self._goto[node].get(char)) is None:
+                    nxt = self._goto[node][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                node = nxt
+            self._out[node] = frozenset([literal])
+
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    def search(self, text: str) -> set[str]:
+        """Return all literals which occur in the text."""
+
+        found: set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found |= out[node]
+
+        return found
+
+
+class Rule:
+    def __init__(self, rule_id: int | None, regex: str, delete: bool, literals: Literals | None):
+        self.id: int | None = rule_id
+        self.regex: str = regex
+        self.delete: bool = delete
+        self.literals: Literals | None = literals
+
+    @property
+    def spec(self) -> RuleSpec:
+        return self.id, self.regex, self.delete
+
+
+class RuleSet:
+    """
+    Compiled content filter rules.
+
+    A single pass of an Aho-Corasick automaton over the message selects the rules whose mandatory literals occur in
+    the message, so only these candidates (and rules without any mandatory literals) have to run their regex.
+    The regexes themselves are evaluated in the RegexSandbox.
+    """
+
+    def __init__(self, specs: Iterable[RuleSpec]):
+        self.rules: list[Rule] = []
+        self._unfiltered: list[Rule] = []
+        self._by_literal: dict[str, list[Rule]] = {}
+
+        for rule_id, regex, delete in specs:
+            try:
+                re.compile(regex)
+            except re.error as e:
+                logger.warning("invalid content filter regex %r: %s", regex, e)
+                continue
+
+            rule = Rule(rule_id, regex, delete, extract_literals(regex))
+            self.rules.append(rule)
+            if rule.literals is None:
+                self._unfiltered.append(rule)
+            else:
+                for literal in rule.literals:
+                    self._by_literal.setdefault(literal, []).append(rule)
+
+        self._matcher = LiteralMatcher(self._by_literal)
+        self._order: dict[str, int] = {rule.regex: i for i, rule in enumerate(self.rules)}
+
+    def candidates(self, text: str) -> list[Rule]:
+        """Return the rules which may match the given text in their original order."""
+
+        candidates = {rule.regex: rule for rule in self._unfiltered}
+        for literal in self._matcher.search(fold(text)):
+            candidates.update((rule.regex, rule) for rule in self._by_literal[literal])
+
+        return sorted(candidates.values(), key=lambda rule: self._order[rule.regex])
+
+
+@lru_cache(maxsize=4)
+def compile_rules(specs: tuple[RuleSpec, ...]) -> RuleSet:
+    return RuleSet(specs)
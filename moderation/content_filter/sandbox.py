@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import signal
+import subprocess  # noqa: S404
+import sys
+from multiprocessing.connection import Connection, Pipe
+
+
+# number of compiled patterns kept by each worker, more than the 512 patterns of the cache of the re module
+MAX_PATTERNS = 4096
+
+
+class SandboxTimeout(Exception):
+    """The sandbox could not evaluate the regexes, e.g. because its worker process died or did not respond."""
+
+
+class RegexTimeout(SandboxTimeout):
+    def __init__(self, regex: str):
+        super().__init__(regex)
+        self.regex: str = regex
+
+
+class _Timeout(BaseException):
+    pass
+
+
+def _alarm(*_) -> None:
+    raise _Timeout
+
+
+def _compile(regex: str) -> re.Pattern | None:
+    try:
+        return re.compile(regex)
+    except re.error:
+        return None
+
+
+def _serve(connection: Connection) -> None:
+    # the re module checks for signals while matching, so the alarm also interrupts catastrophic backtracking
+    signal.signal(signal.SIGALRM, _alarm)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # compiled patterns by regex, None for invalid regexes
+    patterns: dict[str, re.Pattern | None] = {}
+    while True:
+        try:
+            regexes, texts, timeout = connection.recv()
+        except EOFError:
+            return
+
+        if len(patterns) > MAX_PATTERNS:
+            patterns.clear()
+
+        out: list[dict[str, list[str]]] = []
+        regex = None
+        try:
+            for text in texts:
+                result = {}
+                for regex in regexes:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                    try:
+                        if regex not in patterns:
+                            patterns[regex] = _compile(regex)
+                        if (pattern := patterns[regex]) and (matches := [match[0] for match in pattern.finditer(text)]):
+                            result[regex] = matches
+                    finally:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+                out.append(result)
+        except _Timeout:
+            connection.send((None, regex))
+        else:
+            connection.send((out, None))
+
+
+class _Worker:
+    def __init__(self):
+        self.connection, child = Pipe()
+        # The worker is a fresh interpreter which only runs this file. Neither forking the bot (which runs multiple
+        # threads, e.g. for asyncio.to_thread) nor multiprocessing's spawn and forkserver methods (which import the
+        # main module of the bot again in every worker) are safe here.
+        self.process = subprocess.Popen(  # noqa: S603
+            [sys.executable, "-I", __file__, str(child.fileno())], pass_fds=[child.fileno()], stdin=subprocess.DEVNULL
+        )
+        child.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+        self.connection.close()
+
+
+class RegexSandbox:
+    """
+    Small pool of worker processes which evaluate regexes with a time budget.
+
+    Every regex has its own time budget for every text. A regex with catastrophic backtracking is interrupted once it
+    exceeds its budget and only blocks its worker process instead of the event loop of the bot.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[_Worker] = []
+
+        self.evaluations = 0
+        self.timeouts = 0
+
+    async def start(self) -> None:
+        """Start the worker processes in advance, so the first evaluations do not have to wait for them."""
+
+        while len(self._idle) < self.size:
+            self._idle.append(await asyncio.to_thread(_Worker))
+
+    async def _get_worker(self, fresh: bool) -> _Worker:
+        while self._idle and not fresh:
+            worker = self._idle.pop()
+            if worker.process.poll() is None:
+                return worker
+
+            worker.connection.close()
+
+        return await asyncio.to_thread(_Worker)
+
+    async def findall(self, regexes: list[str], text: str) -> dict[str, list[str]]:
+        """
+        Return the matches of all regexes which match the given text.
+
+        Raises RegexTimeout with the offending regex if a single regex exceeds its time budget, or SandboxTimeout if the
+        regexes could not be evaluated at all.
+        """
+
+        if not regexes:
+            return {}
+
+        return (await self.findall_batch(regexes, [text]))[0]
+
+    async def findall_batch(self, regexes: list[str], texts: list[str]) -> list[dict[str, list[str]]]:
+        """Like findall, but for multiple texts at once."""
+
+        if not regexes or not texts:
+            return [{} for _ in texts]
+
+        # the worker itself enforces the time budget of each regex, this deadline only catches unresponsive workers
+        deadline = self.timeout * (len(regexes) * len(texts) + 1)
+
+        async with self._semaphore:
+            # a worker which died or did not respond does not blame any regex, so the batch is retried once on a fresh
+            # worker
+            for retry in (False, True):
+                worker = await self._get_worker(fresh=retry)
+                self.evaluations += 1
+                try:
+                    worker.connection.send((regexes, texts, self.timeout))
+                    if await asyncio.to_thread(worker.connection.poll, deadline):
+                        out, regex = worker.connection.recv()
+                    else:
+                        out = regex = None
+                except (OSError, EOFError):
+                    out = regex = None
+                except asyncio.CancelledError:
+                    # the worker may still be busy with the regexes and cannot be reused
+                    worker.kill()
+                    raise
+
+                if out is None and regex is None:
+                    self.timeouts += 1
+                    await asyncio.to_thread(worker.kill)
+                    continue
+
+                self._idle.append(worker)
+                if regex is not None:
+                    self.timeouts += 1
+                    raise RegexTimeout(regex)
+
+                return out
+
+            raise SandboxTimeout
+
+
+if __name__ == "__main__":
+    _serve(Connection(int(sys.argv[1])))
@@ -32,7 +32,7 @@ from PyDrocsid.util import calculate_edit_distance, check_message_send_permissio
 from .colors import Colors
 from .models import LogExclude
 from .permissions import LoggingPermission
-from .settings import LoggingSettings
+from .settings import LoggingSettings, settings_snapshot
 from ...contributor import Contributor
 from ...pubsub import can_respond_on_reaction, ignore_message_delete, ignore_message_edit, send_alert, send_to_changelog
 
@@ -53,7 +53,7 @@ def add_field(embed: Embed, name: str, text: str):
 
 async def send_to_channel(guild: Guild, setting: LoggingSettings, message: Union[str, Embed]):
     msg = json.dumps(message.to_dict()) if isinstance(message, Embed) else message
-    channel: Optional[TextChannel] = guild.get_channel(await setting.get())
+    channel: Optional[TextChannel] = guild.get_channel(getattr(await settings_snapshot.get(), setting.name))
     if not channel:
         logger.warning(f"Could not send message to {setting.name}: {msg}")
         return
@@ -72,11 +72,8 @@ async def send_to_channel(guild: Guild, setting: LoggingSettings, message: Union
 
 
 async def is_logging_channel(channel: TextChannel) -> bool:
-    for setting in [LoggingSettings.edit_channel, LoggingSettings.delete_channel]:
-        if channel.id == await setting.get():
-            return True
-
-    return False
+    settings = await settings_snapshot.get()
+    return channel.id in (settings.edit_channel, settings.delete_channel)
 
 
 def _dump_embeds(embeds: list[Embed], file_name: str) -> File:
@@ -101,7 +98,7 @@ def add_channel(group: Group, name: str, *aliases: str) -> tuple[Group, Command,
     async def set_channel(ctx: Context, *, channel: TextChannel):
         check_message_send_permissions(channel, check_embed=True)
 
-        await getattr(LoggingSettings, f"{name}_channel").set(channel.id)
+        await settings_snapshot.set(getattr(LoggingSettings, f"{name}_channel"), channel.id)
         embed = Embed(
             title=t.logging,
             description=(text := getattr(t.channels, name).updated(channel.mention)),
@@ -113,7 +110,7 @@ def add_channel(group: Group, name: str, *aliases: str) -> tuple[Group, Command,
     @logging_channel.command(name="disable", aliases=["d"])
     @docs(getattr(t.channels, name).disable_description)
     async def disable_channel(ctx: Context):
-        await getattr(LoggingSettings, f"{name}_channel").reset()
+        await settings_snapshot.reset(getattr(LoggingSettings, f"{name}_channel"))
         embed = Embed(title=t.logging, description=(text := getattr(t.channels, name).disabled), color=Colors.Logging)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, text)
@@ -125,7 +122,7 @@ class LoggingCog(Cog, name="Logging"):
     CONTRIBUTORS = [Contributor.Defelo, Contributor.wolflu, Contributor.Tert0, Contributor.Infinity]
 
     async def get_logging_channel(self, setting: LoggingSettings) -> Optional[TextChannel]:
-        return self.bot.get_channel(await setting.get())
+        return self.bot.get_channel(getattr(await settings_snapshot.get(), setting.name))
 
     @send_to_changelog.subscribe
     async def handle_send_to_changelog(self, guild: Guild, message: Union[str, Embed]):
@@ -137,19 +134,17 @@ class LoggingCog(Cog, name="Logging"):
 
     @can_respond_on_reaction.subscribe
     async def handle_can_respond_on_reaction(self, channel: TextChannel) -> bool:
-        for setting in [
-            LoggingSettings.edit_channel,
-            LoggingSettings.delete_channel,
-            LoggingSettings.alert_channel,
-            LoggingSettings.changelog_channel,
-            LoggingSettings.member_join_channel,
-            LoggingSettings.member_leave_channel,
-            LoggingSettings.member_name_change_channel,
-            # LoggingSettings.member_profile_picture_change_channel,
-        ]:
-            if await setting.get() == channel.id:
-                return False
-        return True
+        settings = await settings_snapshot.get()
+        return channel.id not in (
+            settings.edit_channel,
+            settings.delete_channel,
+            settings.alert_channel,
+            settings.changelog_channel,
+            settings.member_join_channel,
+            settings.member_leave_channel,
+            settings.member_name_change_channel,
+            # settings.member_profile_picture_change_channel,
+        )
 
     @ignore_message_edit.subscribe
     async def handle_ignore_message_edit(self, message: Message):
@@ -169,7 +164,7 @@ class LoggingCog(Cog, name="Logging"):
     @tasks.loop(minutes=30)
     @db_wrapper
     async def cleanup_loop(self):
-        days: int = await LoggingSettings.maxage.get()
+        days: int = (await settings_snapshot.get()).maxage
         if days == -1:
             return
 
@@ -190,7 +185,7 @@ class LoggingCog(Cog, name="Logging"):
             return
         if await redis.delete(f"ignore_message_edit:{before.channel.id}:{before.id}"):
             return
-        mindiff: int = await LoggingSettings.edit_mindiff.get()
+        mindiff: int = (await settings_snapshot.get()).edit_mindiff
         old_message = await redis.get(key := f"little_diff_message_edit:{before.id}") or before.content
         if calculate_edit_distance(old_message, after.content) < mindiff and before.embeds == after.embeds:
             if not await redis.exists(key):
@@ -365,7 +360,7 @@ class LoggingCog(Cog, name="Logging"):
 
         embed = Embed(title=t.logging, color=Colors.Logging)
 
-        maxage: int = await LoggingSettings.maxage.get()
+        maxage: int = (await settings_snapshot.get()).maxage
         if maxage != -1:
             embed.add_field(name=t.maxage, value=tg.x_days(cnt=maxage), inline=False)
         else:
@@ -380,7 +375,7 @@ class LoggingCog(Cog, name="Logging"):
             )
 
             if name == "edit" and channel is not None:
-                mindist: int = await LoggingSettings.edit_mindiff.get()
+                mindist: int = (await settings_snapshot.get()).edit_mindiff
                 embed.add_field(name=t.channels.edit.mindist.name, value=str(mindist), inline=True)
 
         await reply(ctx, embed=embed)
@@ -392,7 +387,7 @@ class LoggingCog(Cog, name="Logging"):
         if days != -1 and not 0 < days < (1 << 31):
             raise CommandError(tg.invalid_duration)
 
-        await LoggingSettings.maxage.set(days)
+        await settings_snapshot.set(LoggingSettings.maxage, days)
         embed = Embed(title=t.logging, color=Colors.Logging)
         if days == -1:
             embed.description = t.maxage_set_disabled
@@ -420,7 +415,7 @@ class LoggingCog(Cog, name="Logging"):
         if mindist <= 0:
             raise CommandError(t.channels.edit.mindist.gt_zero)
 
-        await LoggingSettings.edit_mindiff.set(mindist)
+        await settings_snapshot.set(LoggingSettings.edit_mindiff, mindist)
         embed = Embed(title=t.logging, description=t.channels.edit.mindist.updated(mindist), color=Colors.Logging)
         await reply(ctx, embed=embed)
         await send_to_changelog(ctx.guild, t.channels.edit.mindist.log_updated(mindist))
@@ -1,5 +1,7 @@
 from PyDrocsid.settings import Settings
 
+from ...settings_snapshot import SettingsSnapshot
+
 
 class LoggingSettings(Settings):
     maxage = -1
@@ -13,3 +15,6 @@ class LoggingSettings(Settings):
     member_leave_channel = -1
     member_name_change_channel = -1
     # member_profile_picture_change_channel = -1
+
+
+settings_snapshot = SettingsSnapshot(LoggingSettings)
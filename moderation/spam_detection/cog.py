@@ -1,25 +1,73 @@
 import time
+from collections import OrderedDict
 from datetime import timedelta
 
-from discord import Embed, Forbidden, HTTPException, Member, VoiceState
+from discord import Embed, Forbidden, HTTPException, Member, Message, NotFound, VoiceState
 from discord.ext import commands
 from discord.ext.commands import Context, UserInputError, guild_only
 
 from PyDrocsid.cog import Cog
 from PyDrocsid.command import CommandError, docs, reply
+from PyDrocsid.events import StopEventHandling
 from PyDrocsid.redis_client import redis
 from PyDrocsid.translations import t
 
 from .colors import Colors
+from .flood import FloodDetector
 from .permissions import SpamDetectionPermission
-from .settings import SpamDetectionSettings
+from .settings import SpamDetectionSettings, settings_snapshot
 from ...contributor import Contributor
-from ...pubsub import send_alert, send_to_changelog
+from ...pubsub import check_message_flood, send_alert, send_to_changelog
 
 
 tg = t.g
 t = t.spam_detection
 
+HOP_WINDOW = 60
+# minimum time between two alerts, warnings or mutes of the same user
+HOP_ACTION_COOLDOWN = 10
+
+# Record a channel hop in the sliding window of the user and decide which actions to take, all in one round trip.
+# KEYS: hop window, alert sent flag, warning sent flag, mute flag
+# ARGV: timestamp, window, cooldown, alert threshold, warning threshold, mute threshold
+# Returns the number of hops in the window followed by 1 or 0 for each action.
+HOP_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+redis.call("ZADD", KEYS[1], now, ARGV[1])
+redis.call("EXPIRE", KEYS[1], window)
+local hops = redis.call("ZCARD", KEYS[1])
+
+local out = {hops}
+for i = 1, 3 do
+    local threshold = tonumber(ARGV[i + 3])
+    if threshold > 0 and hops >= threshold and redis.call("SET", KEYS[i + 1], 1, "EX", ARGV[3], "NX") then
+        out[i + 1] = 1
+    else
+        out[i + 1] = 0
+    end
+end
+return out
+"""
+
+hop_window = redis.register_script(HOP_WINDOW_SCRIPT)
+
+# length of the sliding window for message floods in seconds
+FLOOD_WINDOW = 10
+# number of messages per user to keep track of (upper limit for the flood thresholds)
+FLOOD_BUFFER_SIZE = 32
+FLOOD_MAX_USERS = 10000
+# minimum time between two actions against the same user
+FLOOD_ACTION_COOLDOWN = 10
+
+# number of flood check results to remember, so a message which has already been checked via check_message_flood
+# (e.g. by the content filter) is not counted again in on_message
+FLOOD_CHECKED_MESSAGES = 1000
+
+flood_detector = FloodDetector(FLOOD_WINDOW, FLOOD_BUFFER_SIZE, FLOOD_MAX_USERS)
+flood_checked: OrderedDict[int, bool] = OrderedDict()
+
 
 async def _send_changes(ctx: Context, amount: int, change_type: str, description):
     description = description(amount, change_type) if amount > 0 else t.hop_detection_disabled(change_type)
@@ -29,6 +77,27 @@ async def _send_changes(ctx: Context, amount: int, change_type: str, description
     await send_to_changelog(ctx.guild, description)
 
 
+async def _delete_flood_message(message: Message) -> bool:
+    """Delete a message of a flood and return whether it is gone."""
+
+    try:
+        await message.delete()
+    except NotFound:
+        pass
+    except Forbidden:
+        return False
+
+    return True
+
+
+async def _send_flood_changes(ctx: Context, amount: int, description):
+    description = description(amount, FLOOD_WINDOW) if amount > 0 else t.flood_detection_disabled
+    embed = Embed(title=t.message_flood, description=description, colour=Colors.SpamDetection)
+
+    await reply(ctx, embed=embed)
+    await send_to_changelog(ctx.guild, description)
+
+
 class SpamDetectionCog(Cog, name="Spam Detection"):
     CONTRIBUTORS = [Contributor.ce_phox, Contributor.Defelo, Contributor.Infinity]
 
@@ -43,21 +112,25 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
         if before.channel == after.channel:
             return
 
-        alert: int = await SpamDetectionSettings.max_hops_alert.get()
-        warning: int = await SpamDetectionSettings.max_hops_warning.get()
-        mute: int = await SpamDetectionSettings.max_hops_temp_mute.get()
-        duration: int = await SpamDetectionSettings.temp_mute_duration.get()
+        settings = await settings_snapshot.get()
+        alert: int = settings.max_hops_alert
+        warning: int = settings.max_hops_warning
+        mute: int = settings.max_hops_temp_mute
+        duration: int = settings.temp_mute_duration
         if alert == 0 and warning == 0 and mute == 0:
             return
 
-        ts = time.time()
-        await redis.zremrangebyscore(key := f"channel_hops:user={member.id}", min="-inf", max=ts - 60)
-        await redis.zadd(key, {str(ts): ts})
-        await redis.expire(key, 60)
-        hops: int = await redis.zcount(key, "-inf", "inf")
-
-        if hops >= alert > 0 and not await redis.exists(key := f"channel_hops_alert_sent:user={member.id}"):
-            await redis.setex(key, 10, 1)
+        hops, alert_due, warning_due, mute_due = await hop_window(
+            keys=[
+                f"channel_hops:user={member.id}",
+                f"channel_hops_alert_sent:user={member.id}",
+                f"channel_hops_warning_sent:user={member.id}",
+                f"channel_hops_mute:user={member.id}",
+            ],
+            args=[time.time(), HOP_WINDOW, HOP_ACTION_COOLDOWN, alert, warning, mute],
+        )
+
+        if alert_due:
             embed = Embed(
                 title=t.channel_hopping, color=Colors.SpamDetection, description=t.hops_in_last_minute(cnt=hops)
             )
@@ -68,20 +141,89 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
                 embed.add_field(name=t.current_channel, value=after.channel.name)
             await send_alert(member.guild, embed)
 
-        if hops >= warning > 0 and not await redis.exists(key := f"channel_hops_warning_sent:user={member.id}"):
-            await redis.setex(key, 10, 1)
+        if warning_due:
             embed = Embed(title=t.channel_hopping_warning_sent, color=Colors.SpamDetection)
             try:
                 await member.send(embed=embed)
             except (HTTPException, Forbidden):
                 pass
 
-        if hops >= mute > 0 and not await redis.exists(key := f"channel_hops_mute:user={member.id}"):
+        if mute_due:
             try:
                 await member.timeout_for(duration=timedelta(seconds=duration), reason=t.reason)
             except Forbidden:
                 await send_alert(member.guild, t.cant_mute(member.mention, member.id))
-            await redis.setex(key, 10, 1)
+
+    @check_message_flood.subscribe
+    async def handle_check_message_flood(self, message: Message) -> bool | None:
+        return await self.check_flood(message) or None
+
+    async def on_message(self, message: Message):
+        # the other filters (e.g. the content filter) still have to check messages which could not be deleted
+        if await self.check_flood(message):
+            raise StopEventHandling
+
+    async def check_flood(self, message: Message) -> bool:
+        """Check a message for floods once and return whether it has been deleted."""
+
+        if (deleted := flood_checked.get(message.id)) is None:
+            deleted = flood_checked[message.id] = await self.handle_flood(message)
+            if len(flood_checked) > FLOOD_CHECKED_MESSAGES:
+                flood_checked.popitem(last=False)
+
+        return deleted
+
+    async def handle_flood(self, message: Message) -> bool:
+        """
+        Checks for message floods and duplicate messages
+        """
+
+        if message.guild is None or message.author.bot:
+            return False
+
+        settings = await settings_snapshot.get()
+        max_messages: int = settings.flood_max_messages
+        max_duplicates: int = settings.flood_max_duplicates
+        if max_messages == 0 and max_duplicates == 0:
+            return False
+
+        now = time.monotonic()
+        window, messages, duplicates = flood_detector.push(message.author.id, message.content, now)
+        if not message.content:
+            duplicates = 0
+        if not (messages >= max_messages > 0 or duplicates >= max_duplicates > 0):
+            return False
+
+        member: Member = message.author
+        if await SpamDetectionPermission.bypass.check_permissions(member):
+            return False
+
+        if window.last_action is not None and now - window.last_action < FLOOD_ACTION_COOLDOWN:
+            return await _delete_flood_message(message)
+        window.last_action = now
+
+        embed = Embed(
+            title=t.message_flood,
+            color=Colors.SpamDetection,
+            description=t.messages_in_window(messages, duplicates, FLOOD_WINDOW),
+        )
+        embed.add_field(name=tg.member, value=member.mention)
+        embed.add_field(name=t.member_id, value=str(member.id))
+        embed.add_field(name=t.current_channel, value=message.channel.mention)
+        embed.set_author(name=str(member), icon_url=member.display_avatar.url)
+        await send_alert(member.guild, embed)
+
+        try:
+            await member.send(embed=Embed(title=t.message_flood_warning_sent, color=Colors.SpamDetection))
+        except (HTTPException, Forbidden):
+            pass
+
+        try:
+            await member.timeout_for(duration=timedelta(seconds=settings.temp_mute_duration), reason=t.flood_reason)
+        except Forbidden:
+            await send_alert(member.guild, t.cant_mute_flood(member.mention, member.id))
+
+        return await _delete_flood_message(message)
 
     @commands.group(aliases=["spam", "sd"])
     @SpamDetectionPermission.read.check
@@ -114,6 +256,20 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
         mute_duration = await SpamDetectionSettings.temp_mute_duration.get()
         embed.add_field(name=t.mute_duration, value=t.seconds_muted(cnt=mute_duration), inline=False)
 
+        if (flood_messages := await SpamDetectionSettings.flood_max_messages.get()) <= 0:
+            embed.add_field(name=t.message_flood, value=tg.disabled, inline=False)
+        else:
+            embed.add_field(
+                name=t.message_flood, value=t.max_x_messages(FLOOD_WINDOW, cnt=flood_messages), inline=False
+            )
+
+        if (flood_duplicates := await SpamDetectionSettings.flood_max_duplicates.get()) <= 0:
+            embed.add_field(name=t.duplicate_messages, value=tg.disabled, inline=False)
+        else:
+            embed.add_field(
+                name=t.duplicate_messages, value=t.max_x_duplicates(FLOOD_WINDOW, cnt=flood_duplicates), inline=False
+            )
+
         await reply(ctx, embed=embed)
 
     @spam_detection.group(name="channel_hopping", aliases=["ch", "h"])
@@ -128,14 +284,14 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
     @docs(t.commands.alert)
     async def alert(self, ctx: Context, amount: int):
 
-        await SpamDetectionSettings.max_hops_alert.set(max(amount, 0))
+        await settings_snapshot.set(SpamDetectionSettings.max_hops_alert, max(amount, 0))
         await _send_changes(ctx, amount, t.change_types.alerts, t.hop_amount_set)
 
     @channel_hopping.command(name="warning", aliases=["warn", "w", "dm"])
     @docs(t.commands.warning)
     async def warning(self, ctx: Context, amount: int):
 
-        await SpamDetectionSettings.max_hops_warning.set(max(amount, 0))
+        await settings_snapshot.set(SpamDetectionSettings.max_hops_warning, max(amount, 0))
         await _send_changes(ctx, amount, t.change_types.warnings, t.hop_amount_set)
 
     @channel_hopping.group(name="mute", aliases=["m"])
@@ -149,7 +305,7 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
     @docs(t.commands.temp_mute_hops)
     async def hops(self, ctx: Context, amount: int):
 
-        await SpamDetectionSettings.max_hops_temp_mute.set(max(amount, 0))
+        await settings_snapshot.set(SpamDetectionSettings.max_hops_temp_mute, max(amount, 0))
         await _send_changes(ctx, amount, t.change_types.mutes, t.hop_amount_set)
 
     @mute.command(name="duration", aliases=["d"])
@@ -158,5 +314,31 @@ class SpamDetectionCog(Cog, name="Spam Detection"):
         if seconds not in range(1, 28 * 24 * 60 * 60):
             raise CommandError(tg.invalid_duration)
 
-        await SpamDetectionSettings.temp_mute_duration.set(seconds)
+        await settings_snapshot.set(SpamDetectionSettings.temp_mute_duration, seconds)
         await _send_changes(ctx, seconds, t.change_types.mutes, t.mute_time_set)
+
+    @spam_detection.group(name="flood", aliases=["f"])
+    @SpamDetectionPermission.write.check
+    @docs(t.commands.flood)
+    async def flood(self, ctx: Context):
+
+        if not ctx.subcommand_passed or not ctx.invoked_subcommand:
+            raise UserInputError
+
+    @flood.command(name="messages", aliases=["m"])
+    @docs(t.commands.flood_messages)
+    async def flood_messages(self, ctx: Context, amount: int):
+        if amount > FLOOD_BUFFER_SIZE:
+            raise CommandError(t.flood_limit_exceeded(FLOOD_BUFFER_SIZE))
+
+        await settings_snapshot.set(SpamDetectionSettings.flood_max_messages, max(amount, 0))
+        await _send_flood_changes(ctx, amount, t.flood_messages_set)
+
+    @flood.command(name="duplicates", aliases=["d"])
+    @docs(t.commands.flood_duplicates)
+    async def flood_duplicates(self, ctx: Context, amount: int):
+        if amount > FLOOD_BUFFER_SIZE:
+            raise CommandError(t.flood_limit_exceeded(FLOOD_BUFFER_SIZE))
+
+        await settings_snapshot.set(SpamDetectionSettings.flood_max_duplicates, max(amount, 0))
+        await _send_flood_changes(ctx, amount, t.flood_duplicates_set)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict, deque
+from hashlib import blake2b
+
+
+WHITESPACE = re.compile(r"\s+")
+# zero width characters are often inserted to circumvent duplicate detection
+INVISIBLE = str.maketrans(dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff")))
+
+
+def content_hash(content: str) -> bytes:
+    """
+    Hash the normalized content of a message, so trivially modified copies of a message have the same hash.
+
+    Unlike the builtin hash, the digest is the same in every process.
+    """
+
+    normalized = WHITESPACE.sub(" ", content.translate(INVISIBLE)).strip().casefold()
+    return blake2b(normalized.encode(), digest_size=8).digest()
+
+
+class MessageWindow:
+    """Ring buffer of the most recent messages of a user within a sliding time window."""
+
+    def __init__(self, size: int):
+        self._messages: deque[tuple[float, bytes]] = deque()
+        self._size = size
+        self._counts: dict[bytes, int] = {}
+        # time of the last action taken against the user
+        self.last_action: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def _pop(self) -> None:
+        _, digest = self._messages.popleft()
+        if (cnt := self._counts[digest] - 1) > 0:
+            self._counts[digest] = cnt
+        else:
+            del self._counts[digest]
+
+    def expire(self, before: float) -> None:
+        while self._messages and self._messages[0][0] < before:
+            self._pop()
+
+    def push(self, timestamp: float, digest: bytes) -> int:
+        """Add a message to the window and return the number of messages with the same content in the window."""
+
+        if len(self._messages) >= self._size:
+            self._pop()
+
+        self._messages.append((timestamp, digest))
+        self._counts[digest] = cnt = self._counts.get(digest, 0) + 1
+        return cnt
+
+
+class FloodDetector:
+    """
+    Message rate and duplicate detection based on in-memory sliding windows.
+
+    Every message only needs amortized constant time, and the memory is bounded by the size of the ring buffers and
+    the number of tracked users, as the least recently active users are evicted first.
+    """
+
+    def __init__(self, window: float, buffer_size: int, max_users: int):
+        self.window = window
+        self.buffer_size = buffer_size
+        self.max_users = max_users
+        self._users: OrderedDict[int, MessageWindow] = OrderedDict()
+
+        self.messages_processed = 0
+        self.users_evicted = 0
+
+    def push(self, user_id: int, content: str, timestamp: float) -> tuple[MessageWindow, int, int]:
+        """
+        Record a message of a user.
+
+        Returns the message window of the user, the number of messages and the number of messages with the same
+        content in the window.
+        """
+
+        self.messages_processed += 1
+        if (messages := self._users.get(user_id)) is None:
+            messages = self._users[user_id] = MessageWindow(self.buffer_size)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.users_evicted += 1
+        else:
+            self._users.move_to_end(user_id)
+
+        messages.expire(timestamp - self.window)
+        duplicates = messages.push(timestamp, content_hash(content))
+        return messages, len(messages), duplicates
@@ -1,8 +1,15 @@
 from PyDrocsid.settings import Settings
 
+from ...settings_snapshot import SettingsSnapshot
+
 
 class SpamDetectionSettings(Settings):
     max_hops_alert = 0
     max_hops_warning = 0
     max_hops_temp_mute = 0
     temp_mute_duration = 10
+    flood_max_messages = 0
+    flood_max_duplicates = 0
+
+
+settings_snapshot = SettingsSnapshot(SpamDetectionSettings)
@@ -0,0 +1,57 @@
+from collections import namedtuple
+from typing import Any, Generic, Type, TypeVar
+
+from PyDrocsid.redis_client import redis
+from PyDrocsid.settings import Settings
+
+from .invalidation import InvalidationSignal
+
+
+S = TypeVar("S", bound=Settings)
+
+
+class SettingsSnapshot(Generic[S]):
+    """
+    Process local, read only copy of all settings of a settings group.
+
+    All settings of the group are fetched with a single MGET and returned as an immutable named tuple. The copy is only
+    reloaded after a change has been announced via the invalidation signal, so reading settings on hot paths does not
+    need any redis round trips in the steady state. Therefore, settings of a group with a snapshot must only be changed
+    using set and reset of the snapshot.
+    """
+
+    def __init__(self, settings: Type[S]):
+        self.settings: Type[S] = settings
+        self.signal = InvalidationSignal(f"settings:{settings.__name__}")
+        self._type = namedtuple(settings.__name__ + "Snapshot", [setting.name for setting in settings])
+        self._values: tuple | None = None
+
+    async def _load(self) -> tuple:
+        settings: list[S] = [*self.settings]
+        values = []
+        for setting, value in zip(settings, await redis.mget([f"settings:{s.fullname}" for s in settings])):
+            if value is None:
+                # not cached in redis (yet), load the value from the database
+                values.append(await setting.get())
+            else:
+                values.append(setting.type(int(value) if setting.type is bool else value))
+
+        return self._type(*values)
+
+    async def get(self) -> Any:
+        if self._values is None or await self.signal.is_stale():
+            await self.signal.sync()
+            self._values = await self._load()
+
+        return self._values
+
+    async def set(self, setting: S, value: Any) -> Any:
+        await setting.set(value)
+        if self._values is not None:
+            self._values = self._values._replace(**{setting.name: value})
+
+        self.signal.bump_after_commit()
+        return value
+
+    async def reset(self, setting: S) -> Any:
+        return await self.set(setting, setting.default)